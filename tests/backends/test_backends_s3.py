@@ -16,6 +16,7 @@ class TestS3BackendInit:
         backend = S3Backend(mock_authenticators, "test-deployment")
         assert backend._deployment == "test-deployment"
         assert backend._s3_client is not None
+        assert backend.s3_client is backend._s3_client
         assert backend._ddb_client is not None
         assert backend._bucket_files is not None
 
@@ -39,6 +40,7 @@ class TestS3BackendInit:
         backend = S3Backend(mock_authenticators)
         assert backend._deployment == "undefined"
         assert not hasattr(backend, "_s3_client")
+        assert backend.s3_client is None
         assert not hasattr(backend, "_ddb_client")
         assert not hasattr(backend, "_bucket_files")
 
@@ -293,6 +295,21 @@ class TestS3BackendDataHcl:
         assert 'key = "prefix/remote1/terraform.tfstate"' in result
         assert 'key = "prefix/remote2/terraform.tfstate"' in result
 
+    @mock_aws
+    def test_data_hcl_format(self, mock_authenticators):
+        backend = S3Backend(mock_authenticators, "test-deployment")
+        result = backend.data_hcl(["remote1"])
+        assert result == (
+            'data "terraform_remote_state" "remote1" {\n'
+            '  backend = "s3"\n'
+            "  config = {\n"
+            '    region = "us-east-1"\n'
+            '    bucket = "test-bucket"\n'
+            '    key = "prefix/remote1/terraform.tfstate"\n'
+            "  }\n"
+            "}\n"
+        )
+
     @mock_aws
     def test_data_hcl_invalid_remotes(self, mock_authenticators):
         backend = S3Backend(mock_authenticators, "test-deployment")
@@ -446,6 +463,65 @@ class TestS3BackendCleanBucketState:
         assert "prefix/def3/terraform.tfstate" in keys
         assert "prefix/def4/terraform.tfstate" in keys
 
+    @mock_aws
+    def test_clean_bucket_state_batches_deletes(
+        self, mock_authenticators, empty_state, occupied_state
+    ):
+        self.setup_s3(empty_state, occupied_state, all_empty=True)
+        backend = S3Backend(mock_authenticators, "test-deployment")
+        with patch("tfworker.backends.s3.S3_DELETE_BATCH_SIZE", 3), patch.object(
+            backend._s3_client,
+            "delete_objects",
+            wraps=backend._s3_client.delete_objects,
+        ) as mock_delete:
+            backend._clean_bucket_state()
+        assert [
+            len(c.kwargs["Delete"]["Objects"]) for c in mock_delete.call_args_list
+        ] == [3, 1]
+        keys = list(
+            S3Backend.filter_keys(
+                self.s3.get_paginator("list_objects_v2"), "test-bucket"
+            )
+        )
+        assert len(keys) == 0
+
+    @mock_aws
+    def test_clean_bucket_state_removes_empty_before_error(
+        self, mock_authenticators, empty_state, occupied_state
+    ):
+        self.setup_s3(empty_state, occupied_state)
+        backend = S3Backend(mock_authenticators, "test-deployment")
+        # the states are fetched concurrently, but the first one in order is reported
+        with pytest.raises(BackendError, match="def3/terraform.tfstate is not empty"):
+            backend._clean_bucket_state()
+        keys = list(
+            S3Backend.filter_keys(
+                self.s3.get_paginator("list_objects_v2"), "test-bucket"
+            )
+        )
+        assert keys == [
+            "prefix/def3/terraform.tfstate",
+            "prefix/def4/terraform.tfstate",
+        ]
+
+    @mock_aws
+    def test_delete_with_versions_raises_on_errors(self, mock_authenticators):
+        backend = S3Backend(mock_authenticators, "test-deployment")
+        with patch.object(
+            backend._s3_client,
+            "delete_objects",
+            return_value={"Errors": [{"Key": "key1", "Message": "Access Denied"}]},
+        ):
+            with pytest.raises(BackendError, match="key1: Access Denied"):
+                backend._delete_with_versions(["key1"])
+
+    @mock_aws
+    def test_delete_with_versions_no_keys(self, mock_authenticators):
+        backend = S3Backend(mock_authenticators, "test-deployment")
+        with patch.object(backend._s3_client, "delete_objects") as mock_delete:
+            backend._delete_with_versions([])
+        mock_delete.assert_not_called()
+
 
 class TestS3BackendCleanLockingState:
     @mock_aws
@@ -0,0 +1,123 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import click
+import pytest
+from click.globals import get_current_context
+
+from tfworker.commands.terraform import TerraformCommand
+from tfworker.types.terraform import TerraformAction
+
+DEFINITION_NAMES = ["def1", "def2", "def3", "def4"]
+
+
+@pytest.fixture
+def ctx():
+    return click.Context(click.Command("terraform"))
+
+
+def make_command(ctx, parallelism, names=DEFINITION_NAMES):
+    """Create a terraform command without initializing the full application state"""
+    app_state = MagicMock()
+    app_state.definitions = {name: MagicMock() for name in names}
+    app_state.terraform_options.parallelism = parallelism
+    app_state.terraform_options.terraform_bin = "terraform"
+    command = TerraformCommand.__new__(TerraformCommand)
+    command._ctx = ctx
+    command._app_state = app_state
+    command._terraform_config = MagicMock(stream_output=True, env={})
+    return command
+
+
+class TestTerraformCommandRunDefinitions:
+    def test_run_definitions_serial(self, ctx):
+        command = make_command(ctx, parallelism=1)
+        calls = []
+        command._run_definitions(
+            lambda name: calls.append((name, threading.current_thread()))
+        )
+        assert [name for name, _ in calls] == DEFINITION_NAMES
+        assert all(thread is threading.main_thread() for _, thread in calls)
+
+    def test_run_definitions_concurrent(self, ctx):
+        command = make_command(ctx, parallelism=4)
+        # every definition must be running at the same time to pass the barrier
+        barrier = threading.Barrier(len(DEFINITION_NAMES), timeout=5)
+        contexts = {}
+
+        def func(name):
+            barrier.wait()
+            contexts[name] = get_current_context()
+
+        command._run_definitions(func)
+        assert sorted(contexts) == DEFINITION_NAMES
+        assert all(c is ctx for c in contexts.values())
+
+    @pytest.mark.parametrize(
+        "error, exception",
+        [
+            (RuntimeError("failed"), RuntimeError),
+            (None, click.exceptions.Exit),
+        ],
+    )
+    def test_run_definitions_failure(self, ctx, error, exception):
+        command = make_command(ctx, parallelism=2)
+        calls = []
+        started = threading.Event()
+
+        def func(name):
+            calls.append(name)
+            if name == "def1":
+                # fail once the second definition is running
+                started.wait(timeout=5)
+                if error is not None:
+                    raise error
+                get_current_context().exit(1)
+            started.set()
+            # keep the second worker busy, the failed worker is the only one free
+            time.sleep(0.1)
+
+        with pytest.raises(exception):
+            command._run_definitions(func)
+        # the running definition finishes, those which have not started are skipped
+        assert sorted(calls) == ["def1", "def2"]
+
+
+class TestTerraformCommandOutput:
+    def test_run_prefixes_concurrent_output(self, mocker, ctx, capsys):
+        command = make_command(ctx, parallelism=2)
+        mock_pipe_exec = mocker.patch(
+            "tfworker.commands.terraform.pipe_exec", return_value=(0, b"", b"")
+        )
+        command._run("def1", TerraformAction.PLAN)
+        on_line = mock_pipe_exec.call_args.kwargs["on_line"]
+        on_line(b"Plan: 1 to add\r")
+        assert capsys.readouterr().out == "def1: Plan: 1 to add\n"
+
+    def test_run_does_not_prefix_serial_output(self, mocker, ctx):
+        command = make_command(ctx, parallelism=1)
+        mock_pipe_exec = mocker.patch(
+            "tfworker.commands.terraform.pipe_exec", return_value=(0, b"", b"")
+        )
+        command._run("def1", TerraformAction.PLAN)
+        assert mock_pipe_exec.call_args.kwargs["on_line"] is None
+
+    def test_run_does_not_prefix_apply_output(self, mocker, ctx):
+        command = make_command(ctx, parallelism=2)
+        mock_pipe_exec = mocker.patch(
+            "tfworker.commands.terraform.pipe_exec", return_value=(0, b"", b"")
+        )
+        command._run("def1", TerraformAction.APPLY)
+        assert mock_pipe_exec.call_args.kwargs["on_line"] is None
+
+    @pytest.mark.parametrize("parallelism, streamed", [(1, True), (2, False)])
+    def test_init_streams_module_downloads(self, mocker, ctx, parallelism, streamed):
+        command = make_command(ctx, parallelism=parallelism)
+        mock_prepare = mocker.patch("tfworker.definitions.prepare.DefinitionPrepare")
+        mocker.patch.object(command, "_exec_terraform_action")
+        command.terraform_init()
+        download_modules = mock_prepare.return_value.download_modules
+        assert download_modules.call_count == len(DEFINITION_NAMES)
+        for call in download_modules.call_args_list:
+            assert call.kwargs["stream_output"] is streamed
@@ -7,10 +7,18 @@ import click
 import pytest
 from moto import mock_aws
 
+import tfworker.util.hooks as hooks
+import tfworker.util.log as log
+import tfworker.util.terraform as tf
+import tfworker.util.terraform_helpers as tfhelpers
 from tfworker.app_state import AppState
 from tfworker.authenticators import AuthenticatorsCollection
 from tfworker.cli_options import CLIOptionsClean, CLIOptionsRoot, CLIOptionsTerraform
+from tfworker.copier import FileSystemCopier, GitCopier
+from tfworker.definitions.model import _find_used_providers
 from tfworker.types.config_file import ConfigFile, GlobalVars
+from tfworker.util.cli import validate_host
+from tfworker.util.system import _split_command, get_platform
 
 
 @pytest.fixture(scope="function")
@@ -191,3 +199,40 @@ def mock_click_context_backend_west(mock_app_state_backend_west):
 def setup_method(mocker, mock_click_context):
     """A fixture to setup the click context which is used throughout"""
     mocker.patch("click.get_current_context", return_value=mock_click_context)
+
+
+def _clear_memoization():
+    """Reset every module level cache and memoized function"""
+    for func in (
+        _find_used_providers,
+        _split_command,
+        get_platform,
+        hooks.check_hooks,
+        log._compile_redact_keys,
+        log._compile_redact_pattern,
+        tf.get_provider_gid_from_source,
+        tfhelpers._get_specifier_set,
+        tfhelpers._list_provider_dir,
+        tfhelpers._load_version_file,
+        validate_host,
+    ):
+        func.cache_clear()
+    for cache in (
+        FileSystemCopier._found,
+        GitCopier._remotes,
+        hooks._output_cache,
+        hooks._output_cache_locks,
+        hooks._state_cache_mem,
+        hooks._worker_file_cache,
+        tf._terraform_version_cache,
+        tfhelpers._tf_parse_cache,
+    ):
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_memoization():
+    """Results memoized by one test must never be seen by another"""
+    _clear_memoization()
+    yield
+    _clear_memoization()
@@ -1,3 +1,4 @@
+import errno
 import os
 import platform
 import tempfile
@@ -78,6 +79,24 @@ class TestCopierFactory:
         with pytest.raises(NotImplementedError):
             CopyFactory.get_copier_type("invalid")
 
+    def test_get_copier_type_probe_order(self):
+        """test that copiers in the probe order are checked before other copiers"""
+        probed = []
+
+        def make_copier(name):
+            class ProbeCopier:
+                @staticmethod
+                def type_match(source: str, **kwargs) -> bool:
+                    probed.append(name)
+                    return name == "fs"
+
+            return ProbeCopier
+
+        registry = {x: make_copier(x) for x in ["git", "other", "fs"]}
+        with patch.object(CopyFactory, "registry", registry):
+            assert CopyFactory.get_copier_type("test") == "fs"
+        assert probed == ["fs"]
+
     def test_create_copier(self):
         """test that the proper object is returned given the test copier source"""
         assert type(CopyFactory.create("test")).__name__ == "TestCopierFixture"
@@ -90,19 +109,27 @@ class TestCopier:
     def test_constructor(self, tmp_path, copier, cwp):
         """test that the copiers have expected properties"""
         assert copier._source == C_SOURCE
-        assert not hasattr(copier, "_root_path")
-        assert not hasattr(copier, "_destination")
-        assert not hasattr(copier, "_conflicts")
+        assert copier._root_path is None
+        assert copier._destination is None
+        assert copier._conflicts is None
         assert len(copier._kwargs) == 0
 
         assert cwp._source == C_SOURCE
         assert cwp._root_path == C_ROOT_PATH
         assert cwp._destination == str(tmp_path)
         assert cwp._conflicts == C_CONFLICTS
-        assert cwp._kwargs["arbitrary"] == "value"
+        assert cwp._kwargs == {"arbitrary": "value"}
 
         with pytest.raises(ValueError):
             Copier(source="test_source", conflicts="bad_value")
+        with pytest.raises(ValueError) as e:
+            Copier(source="test_source", conflicts=1)
+        # the TypeError from iterating the value is not chained to the ValueError
+        assert e.value.__suppress_context__
+
+        # any iterable of filenames is accepted
+        tc = Copier(source="test_source", conflicts=tuple(C_CONFLICTS))
+        assert tc.conflicts == C_CONFLICTS
 
     def test_source(self, copier, cwp):
         """test the source property"""
@@ -146,6 +173,13 @@ class TestCopier:
             is None
         )
 
+    def test_check_conflicts_not_a_directory(self, tmp_path, cwp):
+        """a path which is a file or does not exist has no conflicts"""
+        file_path = tmp_path / "test.tf"
+        file_path.write_text("")
+        assert cwp.check_conflicts(str(file_path)) is None
+        assert cwp.check_conflicts(str(tmp_path / "missing")) is None
+
     def test_get_destination(self, tmp_path, copier):
         dpath = f"{str(tmp_path)}/destination_test)"
 
@@ -168,8 +202,7 @@ class TestCopier:
         dpath = dpath_td.name
 
         # ensure object is in valid state for test
-        with pytest.raises(AttributeError):
-            getattr(copier, "_destination")
+        assert copier._destination is None
 
         assert copier.get_destination(**{"destination": dpath}) == dpath
 
@@ -181,3 +214,28 @@ class TestCopier:
 
         # remove the temporary directory
         del dpath_td
+
+    def test_fast_copy(self, tmp_path):
+        """test that fast_copy copies the content and mode of a file"""
+        src = tmp_path / "src.tf"
+        src.write_bytes(b"resource {}\n" * 1000)
+        src.chmod(0o640)
+        dst = tmp_path / "dst.tf"
+
+        assert Copier.fast_copy(str(src), str(dst)) == str(dst)
+        assert dst.read_bytes() == src.read_bytes()
+        assert dst.stat().st_mode == src.stat().st_mode
+
+    def test_fast_copy_unsupported(self, tmp_path):
+        """test that fast_copy falls back to a regular copy when the kernel can not copy the file"""
+        src = tmp_path / "src.tf"
+        src.write_bytes(b"resource {}\n")
+        dst = tmp_path / "dst.tf"
+
+        with patch(
+            "tfworker.copier.factory.os.copy_file_range",
+            side_effect=OSError(errno.EXDEV, "Invalid cross-device link"),
+            create=True,
+        ):
+            Copier.fast_copy(str(src), str(dst))
+        assert dst.read_bytes() == src.read_bytes()
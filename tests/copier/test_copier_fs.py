@@ -4,6 +4,7 @@ import tempfile
 import pytest
 
 from tfworker.copier import FileSystemCopier
+from tfworker.copier.fs_copier import _is_dir_or_file
 
 
 class TestFileSystemCopier:
@@ -80,6 +81,12 @@ class TestFileSystemCopier:
         # this should return false because the source is not a valid directory
         assert FileSystemCopier.type_match("/some/invalid/path") is False
 
+    def test_type_match_created_later(self, tmp_path):
+        """a source which is missing when first matched is found once it exists"""
+        assert FileSystemCopier.type_match("later", root_path=str(tmp_path)) is False
+        (tmp_path / "later").mkdir()
+        assert FileSystemCopier.type_match("later", root_path=str(tmp_path)) is True
+
     @pytest.mark.parametrize(
         "source, root_path, expected",
         [
@@ -94,3 +101,13 @@ class TestFileSystemCopier:
             FileSystemCopier.make_local_path(source=source, root_path=root_path)
             == expected
         )
+
+
+def test_is_dir_or_file(tmp_path):
+    (tmp_path / "file.tf").write_text("")
+    os.mkfifo(tmp_path / "fifo")
+
+    assert _is_dir_or_file(str(tmp_path)) is True
+    assert _is_dir_or_file(str(tmp_path / "file.tf")) is True
+    assert _is_dir_or_file(str(tmp_path / "fifo")) is False
+    assert _is_dir_or_file(str(tmp_path / "missing")) is False
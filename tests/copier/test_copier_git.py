@@ -2,6 +2,8 @@ import os
 import platform
 import re
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple
 from unittest import mock
 
@@ -17,7 +19,7 @@ else:
     C_ROOT_PATH = "/tmp/test/"
 
 
-def mock_pipe_exec_type_match(cmd: str) -> Tuple[int, str, str]:
+def mock_pipe_exec_type_match(cmd: str, **kwargs) -> Tuple[int, str, str]:
     """a mock function to return specific results based on supplied command"""
     tokens = " ".join(cmd.split()).split(" ")
     if tokens[1] == "ls-remote":
@@ -36,8 +38,8 @@ def mock_pipe_exec_type_match(cmd: str) -> Tuple[int, str, str]:
 def mock_pipe_exec_clone(cmd: str, cwd: str) -> Tuple[int, str, str]:
     """a mock function to copy files and imitate a git clone"""
     tokens = re.split(r"\s+", cmd)
-    assert os.path.isdir(tokens[2])
-    shutil.copytree(tokens[2], cwd, dirs_exist_ok=True)
+    assert os.path.isdir(tokens[-2])
+    shutil.copytree(tokens[-2], cwd, dirs_exist_ok=True)
     return (0, "", "")
 
 
@@ -57,7 +59,7 @@ class TestGitCopier:
 
             assert (
                 mocked.call_args.args[0]
-                == f"git clone {spath} --branch master --single-branch ./"
+                == f"git clone --depth 1 --branch master --single-branch {spath} ./"
             )
 
             """ test a succeeding condition, extra options passed """
@@ -72,7 +74,7 @@ class TestGitCopier:
             )
             assert (
                 mocked.call_args.args[0]
-                == f"git clone {spath} --branch foo --single-branch ./"
+                == f"git clone --depth 1 --branch foo --single-branch {spath} ./"
             )
             assert os.path.isfile(f"{dpath}/test.tf")
 
@@ -84,17 +86,42 @@ class TestGitCopier:
         ) as mocked:
             result = GitCopier.type_match("permissionerror")
             assert result is False
-            mocked.assert_called_with("git  ls-remote permissionerror")
+            mocked.assert_called_with("git  ls-remote permissionerror", env=mock.ANY)
+            assert mocked.call_args.kwargs["env"]["GIT_TERMINAL_PROMPT"] == "0"
 
             result = GitCopier.type_match("filenotfounderror")
             assert result is False
-            mocked.assert_called_with("git  ls-remote filenotfounderror")
+            mocked.assert_called_with("git  ls-remote filenotfounderror", env=mock.ANY)
 
             result = GitCopier.type_match(
                 "string_inspect", git_cmd="/opt/bin/git", git_args="--bar"
             )
             assert result is True
-            mocked.assert_called_with("/opt/bin/git --bar ls-remote string_inspect")
+            mocked.assert_called_with(
+                "/opt/bin/git --bar ls-remote string_inspect", env=mock.ANY
+            )
+
+            # a failed probe is not remembered, the source is probed again
+            call_count = mocked.call_count
+            assert GitCopier.type_match("filenotfounderror") is False
+            assert mocked.call_count == call_count + 1
+
+            # a repeated probe of the same source is served from the cache
+            call_count = mocked.call_count
+            result = GitCopier.type_match(
+                "string_inspect", git_cmd="/opt/bin/git", git_args="--bar"
+            )
+            assert result is True
+            assert mocked.call_count == call_count
+
+            # unambiguous git remotes do not require a probe
+            for source in [
+                "git@github.com:ephur/terraform-worker.git",
+                "ssh://git@github.com/ephur/terraform-worker",
+                "https://github.com/ephur/terraform-worker.git",
+            ]:
+                assert GitCopier.type_match(source) is True
+            assert mocked.call_count == call_count
 
     def test_make_and_clean_temp(self):
         """tests making the temporary directory for git clones"""
@@ -102,19 +129,107 @@ class TestGitCopier:
 
         # ensure that the temp directory is created and attributes are set
         c.make_temp()
-        assert hasattr(c, "_temp_dir")
+        assert c._temp_dir is not None
         temp_dir = c._temp_dir
         assert os.path.isdir(temp_dir)
-        assert hasattr(c, "_temp_dir")
+        assert c._temp_dir is not None
 
         # ensure that the function is idempotent
         c.make_temp()
         # ensure that the temp directory is the same
         assert temp_dir == c._temp_dir
         assert os.path.isdir(c._temp_dir)
-        assert hasattr(c, "_temp_dir")
+        assert c._temp_dir is not None
+
+        # ensure that temp directories are created under a shared base directory
+        c2 = GitCopier("test_source")
+        c2.make_temp()
+        assert c2._temp_dir != temp_dir
+        assert os.path.dirname(c2._temp_dir) == os.path.dirname(temp_dir)
+        c2.clean_temp()
 
         # ensure that the temp directory is removed
         c.clean_temp()
         assert not os.path.isdir(temp_dir)
-        assert not hasattr(c, "_temp_dir")
+        assert c._temp_dir is None
+
+    def test_get_base_temp_concurrent(self, tmp_path):
+        """the shared base directory is created once, even by concurrent copiers"""
+
+        def slow_mkdtemp(**kwargs):
+            time.sleep(0.05)
+            return str(tmp_path)
+
+        with mock.patch.object(GitCopier, "_base_temp", None), mock.patch(
+            "tfworker.copier.git_copier.tempfile.mkdtemp", side_effect=slow_mkdtemp
+        ) as mocked, mock.patch("tfworker.copier.git_copier.atexit.register"):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(
+                    executor.map(lambda _: GitCopier._get_base_temp(), range(4))
+                )
+        assert mocked.call_count == 1
+        assert results == [str(tmp_path)] * 4
+
+    def test_move_tree(self, tmp_path):
+        """tests moving a cloned tree into an empty and a populated destination"""
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "test.tf").write_text("foo")
+
+        # an empty destination is replaced via rename
+        empty_dest = tmp_path / "empty"
+        empty_dest.mkdir()
+        GitCopier.move_tree(str(src), str(empty_dest))
+        assert (empty_dest / "test.tf").read_text() == "foo"
+        assert not src.exists()
+
+        # a populated destination falls back to a merging copy
+        src.mkdir()
+        (src / "test.tf").write_text("bar")
+        full_dest = tmp_path / "full"
+        full_dest.mkdir()
+        (full_dest / "other.tf").write_text("baz")
+        GitCopier.move_tree(str(src), str(full_dest))
+        assert (full_dest / "test.tf").read_text() == "bar"
+        assert (full_dest / "other.tf").read_text() == "baz"
+
+    def test_move_tree_symlink_outside_sub_path(self, tmp_path):
+        """tests that a symlink out of the moved sub path keeps its contents once the clone is removed"""
+        clone = tmp_path / "clone"
+        (clone / "modules").mkdir(parents=True)
+        (clone / "modules" / "m.tf").write_text("module")
+        sub_path = clone / "defs" / "a"
+        sub_path.mkdir(parents=True)
+        (sub_path / "main.tf").write_text("main")
+        (sub_path / "modules").symlink_to("../../modules")
+
+        dest = tmp_path / "dest"
+        dest.mkdir()
+        GitCopier.move_tree(str(sub_path), str(dest))
+        shutil.rmtree(clone)
+
+        assert not (dest / "modules").is_symlink()
+        assert (dest / "modules" / "m.tf").read_text() == "module"
+        assert (dest / "main.tf").read_text() == "main"
+
+    def test_link_or_copy(self, tmp_path):
+        """tests that cloned files are linked, and symlinks or existing files are copied"""
+        src = tmp_path / "test.tf"
+        src.write_text("foo")
+        outside = tmp_path / "outside.tf"
+        outside.write_text("bar")
+        symlink = tmp_path / "symlink.tf"
+        symlink.symlink_to(outside)
+
+        dst = tmp_path / "linked.tf"
+        assert GitCopier.link_or_copy(str(src), str(dst)) == str(dst)
+        assert os.path.samefile(src, dst)
+
+        copied = tmp_path / "copied.tf"
+        GitCopier.link_or_copy(str(symlink), str(copied))
+        assert copied.read_text() == "bar"
+        assert not os.path.samefile(outside, copied)
+
+        # an existing destination is overwritten by a copy
+        GitCopier.link_or_copy(str(outside), str(dst))
+        assert dst.read_text() == "bar"
@@ -205,3 +205,13 @@ class TestDefinitionModel:
         )
         testdef = Definition(**mock_definition())
         assert testdef.get_used_providers("working_dir_two") is None
+
+    def test_get_used_providers_cached(self, mocker):
+        mocked = mocker.patch(
+            "tfworker.util.terraform.find_required_providers", return_value={"aws": ""}
+        )
+        testdef = Definition(**mock_definition())
+        first = testdef.get_used_providers("working_dir")
+        first.append("google")
+        assert testdef.get_used_providers("working_dir") == ["aws"]
+        mocked.assert_called_once()
@@ -2,6 +2,7 @@ import pytest
 
 from tfworker.definitions.prepare import DefinitionPrepare, get_coppier, copy, get_jinja_env, write_template_file, filter_templates, vars_typer
 from tfworker.definitions import Definition, DefinitionsCollection
+from tfworker.constants import WORKER_LOCALS_FILENAME, WORKER_TFVARS_FILENAME
 from tfworker.exceptions import TFWorkerException, ReservedFileError
 
 @pytest.fixture
@@ -60,5 +61,36 @@ class TestDefinitionPrepareWriteTemplates:
             template_file="template1.tf",)
 
 class TestDefinitionPrepareCreateLocalVars:
-    def test_create_local_vars(self, mocker, ):
+    def test_create_local_vars(self, mocker, tmp_path, def_prepare):
         """ make sure the local vars file is created with expected content """
+        mocker.patch.object(Definition, 'get_target_path', return_value=str(tmp_path))
+        mocker.patch.object(Definition, 'get_remote_vars', return_value={'a': 'def2.outputs.a', 'b': 'def3.outputs.b'})
+        def_prepare.create_local_vars('def1')
+        assert (tmp_path / WORKER_LOCALS_FILENAME).read_text() == (
+            'locals {\n'
+            '  a = data.terraform_remote_state.def2.outputs.a\n'
+            '  b = data.terraform_remote_state.def3.outputs.b\n'
+            '}\n\n'
+        )
+
+class TestDefinitionPrepareCreateTerraformVars:
+    def test_create_terraform_vars(self, mocker, tmp_path, def_prepare):
+        """ make sure the terraform vars file is created with expected content """
+        mocker.patch.object(Definition, 'get_target_path', return_value=str(tmp_path))
+        mocker.patch.object(Definition, 'get_terraform_vars', return_value={'a': 'foo', 'b': True, 'c': ['bar']})
+        def_prepare.create_terraform_vars('def1')
+        assert (tmp_path / WORKER_TFVARS_FILENAME).read_text() == 'a = "foo"\nb = true\nc = ["bar"]\n'
+
+class TestVarsTyper:
+    @pytest.mark.parametrize("value, expected", [
+        (True, "true"),
+        (False, "false"),
+        ("foo", '"foo"'),
+        (1, '"1"'),
+        (["foo", True, 1], '["foo", "true", "1"]'),
+        ({"foo": "bar", "baz": False}, '{"foo": "bar", "baz": "false"}'),
+        ({"foo": ["bar", {"baz": True}]}, '{"foo": ["bar", {"baz": "true"}]}'),
+    ])
+    def test_vars_typer(self, value, expected):
+        """ make sure values, including nested lists and dicts, are typed for terraform """
+        assert vars_typer(value) == expected
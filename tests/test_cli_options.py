@@ -325,6 +325,14 @@ class TestCLIOptionsTerraform:
         with pytest.raises(ValueError):
             c.CLIOptionsTerraform(limit=["module1", "module2"])
 
+    def test_parallelism_default(self):
+        cli_options = c.CLIOptionsTerraform()
+        assert cli_options.parallelism == 1
+
+    def test_parallelism_invalid(self):
+        with pytest.raises(ValueError):
+            c.CLIOptionsTerraform(parallelism=0)
+
 
 class TestCLIOptionsClean:
     """
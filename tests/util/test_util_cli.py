@@ -3,9 +3,9 @@ from unittest.mock import patch
 
 import click
 import pytest
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
-from tfworker.util.cli import pydantic_to_click, validate_host
+from tfworker.util.cli import handle_config_error, pydantic_to_click, validate_host
 
 
 class ATestModel(BaseModel):
@@ -111,3 +111,26 @@ def test_vlidate_host_invalid_os_machine():
             validate_host()
         assert "running on windows" in str(e.value)
         assert "running on i386" in str(e.value)
+
+
+def test_handle_config_error():
+    """ensure all config errors are reported with their details"""
+
+    class ConfigModel(BaseModel):
+        name: str
+        count: int
+
+    with pytest.raises(ValidationError) as e:
+        ConfigModel.model_validate({"count": "many"})
+
+    with patch("tfworker.util.cli.log.error") as mock_error, patch(
+        "tfworker.util.cli.click.get_current_context"
+    ) as mock_ctx:
+        handle_config_error(e.value)
+
+    mock_ctx.return_value.exit.assert_called_once_with(1)
+    message = mock_error.call_args.args[0]
+    assert message.startswith("config errors:\n    Details:\n      Error Type: ")
+    assert message.count("Details:") == 2
+    assert "Error Loc: ('name',)" in message
+    assert "Input Value: many" in message
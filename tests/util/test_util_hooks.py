@@ -1,8 +1,11 @@
+import json
+import os
 from unittest import mock
 
 import pytest
 
 import tfworker.util.hooks as hooks
+from tfworker.constants import WORKER_LOCALS_FILENAME, WORKER_TFVARS_FILENAME
 from tfworker.exceptions import HookError
 from tfworker.types.terraform import TerraformAction, TerraformStage
 
@@ -85,13 +88,99 @@ class TestGetStateItem:
 class TestGetStateItemFromOutput:
     @mock.patch("tfworker.util.hooks.pipe_exec")
     def test_get_state_item_from_output_success(self, mock_pipe_exec):
-        mock_pipe_exec.return_value = (0, '{"key":"value"}', "")
+        mock_pipe_exec.return_value = (
+            0,
+            '{"item":{"sensitive":false,"type":"string","value":{"key":"value"}}}',
+            "",
+        )
         result = hooks._get_state_item_from_output(
             "working_dir", {}, "terraform_bin", "state", "item"
         )
         assert result == '{"key":"value"}'
         mock_pipe_exec.assert_called_once()
 
+    @mock.patch("tfworker.util.hooks.pipe_exec")
+    def test_get_state_item_from_output_json_format(self, mock_pipe_exec):
+        mock_pipe_exec.return_value = (
+            0,
+            '{"item":{"value":{"name":"caf\u00e9","big":100000000000000000000}}}',
+            "",
+        )
+        result = hooks._get_state_item_from_output(
+            "working_dir", {}, "terraform_bin", "state", "item"
+        )
+        assert result == '{"name":"caf\\u00e9","big":100000000000000000000}'
+
+    @mock.patch("tfworker.util.hooks.pipe_exec")
+    def test_get_state_item_from_output_cached(self, mock_pipe_exec):
+        mock_pipe_exec.return_value = (
+            0,
+            '{"item":{"value":"one"},"other_item":{"value":"two"}}',
+            "",
+        )
+        assert (
+            hooks._get_state_item_from_output(
+                "working_dir", {}, "terraform_bin", "state", "item"
+            )
+            == '"one"'
+        )
+        assert (
+            hooks._get_state_item_from_output(
+                "working_dir", {}, "terraform_bin", "state", "other_item"
+            )
+            == '"two"'
+        )
+        mock_pipe_exec.assert_called_once_with(
+            ("terraform_bin", "output", "-json", "-no-color"), cwd="/state", env={}
+        )
+
+        # clearing the cache forces the outputs to be read again
+        hooks.clear_output_cache()
+        hooks._get_state_item_from_output(
+            "working_dir", {}, "terraform_bin", "state", "item"
+        )
+        assert mock_pipe_exec.call_count == 2
+
+    @mock.patch("tfworker.util.hooks.pipe_exec")
+    def test_get_state_item_from_output_failure_cached(self, mock_pipe_exec):
+        mock_pipe_exec.return_value = (1, "", b"error")
+        hooks._prefetch_state_outputs("", {}, "terraform_bin", "state")
+        for _ in range(2):
+            with pytest.raises(HookError, match="Error reading remote state"):
+                hooks._get_state_item_from_output(
+                    "working_dir", {}, "terraform_bin", "state", "item"
+                )
+        mock_pipe_exec.assert_called_once()
+
+        # clearing the cache retries the failed state
+        hooks.clear_output_cache()
+        with pytest.raises(HookError):
+            hooks._get_state_item_from_output(
+                "working_dir", {}, "terraform_bin", "state", "item"
+            )
+        assert mock_pipe_exec.call_count == 2
+
+    @mock.patch("tfworker.util.hooks.pipe_exec")
+    def test_clear_output_cache_keeps_locks(self, mock_pipe_exec):
+        mock_pipe_exec.return_value = (0, '{"item":{"value":"one"}}', "")
+        hooks._get_state_item_from_output(
+            "working_dir", {}, "terraform_bin", "state", "item"
+        )
+        lock = hooks._output_cache_locks[("", "state")]
+        hooks.clear_output_cache()
+        assert hooks._output_cache == {}
+        # a thread still loading the state keeps using the same lock
+        assert hooks._output_cache_locks[("", "state")] is lock
+
+    @mock.patch("tfworker.util.hooks.pipe_exec")
+    def test_get_state_item_from_output_missing_item(self, mock_pipe_exec):
+        mock_pipe_exec.return_value = (0, '{"other_item":{"value":"two"}}', "")
+        with pytest.raises(HookError) as e:
+            hooks._get_state_item_from_output(
+                "working_dir", {}, "terraform_bin", "state", "item"
+            )
+        assert "Remote state item state.item not found" in str(e.value)
+
     @mock.patch("tfworker.util.hooks.pipe_exec", side_effect=FileNotFoundError)
     def test_get_state_item_from_output_file_not_found(self, mock_pipe_exec):
         with pytest.raises(FileNotFoundError):
@@ -114,7 +203,7 @@ class TestGetStateItemFromOutput:
             hooks._get_state_item_from_output(
                 "working_dir", {}, "terraform_bin", "state", "item"
             )
-        assert "Remote state item state.item is empty" in str(e.value)
+        assert "Remote state outputs for state are empty" in str(e.value)
 
     @mock.patch("tfworker.util.hooks.pipe_exec")
     def test_get_state_item_from_output_invalid_json(self, mock_pipe_exec):
@@ -128,20 +217,20 @@ class TestGetStateItemFromOutput:
 
 # Test for `check_hooks`
 class TestCheckHooks:
-    @mock.patch("tfworker.util.hooks.os.path.isdir", return_value=True)
-    @mock.patch(
-        "tfworker.util.hooks.os.listdir",
-        return_value=[f"{TerraformStage.PRE}_{TerraformAction.PLAN}"],
-    )
-    @mock.patch("tfworker.util.hooks.os.access", return_value=True)
-    def test_check_hooks_exists(self, mock_access, mock_listdir, mock_isdir):
+    @pytest.fixture
+    def hook_dir(self, tmp_path):
+        hook_dir = tmp_path / "hooks"
+        hook_dir.mkdir()
+        return hook_dir
+
+    @pytest.mark.parametrize("ext", ["", ".sh", ".rb"])
+    def test_check_hooks_exists(self, tmp_path, hook_dir, ext):
+        hook_file = hook_dir / f"{TerraformStage.PRE}_{TerraformAction.PLAN}{ext}"
+        hook_file.touch(mode=0o755)
         result = hooks.check_hooks(
-            TerraformStage.PRE, "working_dir", TerraformAction.PLAN
+            TerraformStage.PRE, str(tmp_path), TerraformAction.PLAN
         )
         assert result is True
-        mock_isdir.assert_called_once()
-        mock_listdir.assert_called_once()
-        mock_access.assert_called_once()
 
     @mock.patch("tfworker.util.hooks.os.path.isdir", return_value=False)
     def test_check_hooks_no_dir(self, mock_isdir):
@@ -149,25 +238,26 @@ class TestCheckHooks:
         assert result is False
         mock_isdir.assert_called_once()
 
-    @mock.patch("tfworker.util.hooks.os.path.isdir", return_value=True)
-    @mock.patch(
-        "tfworker.util.hooks.os.listdir",
-        return_value=[f"{TerraformStage.PRE}_{TerraformAction.PLAN}"],
-    )
-    @mock.patch("tfworker.util.hooks.os.access", return_value=False)
-    def test_check_hooks_not_executable(self, mock_listdir, mock_isdir, mock_access):
+    def test_check_hooks_not_executable(self, tmp_path, hook_dir):
+        hook_file = hook_dir / f"{TerraformStage.PRE}_{TerraformAction.PLAN}"
+        hook_file.touch(mode=0o644)
         with pytest.raises(HookError) as e:
-            hooks.check_hooks(TerraformStage.PRE, "working_dir", TerraformAction.PLAN)
-        assert "working_dir/hooks/pre_plan exists, but is not executable!" in str(
-            e.value
-        )
+            hooks.check_hooks(TerraformStage.PRE, str(tmp_path), TerraformAction.PLAN)
+        assert f"{hook_file} exists, but is not executable!" in str(e.value)
 
-    @mock.patch("tfworker.util.hooks.os.path.isdir", return_value=True)
-    @mock.patch("tfworker.util.hooks.os.listdir", return_value=[])
-    def test_check_hooks_no_hooks(self, mock_listdir, mock_isdir):
-        result = hooks.check_hooks("phase", "working_dir", "command")
+    def test_check_hooks_no_hooks(self, tmp_path, hook_dir):
+        result = hooks.check_hooks("phase", str(tmp_path), "command")
         assert result is False
 
+    def test_check_hooks_cached(self, tmp_path, hook_dir):
+        hook_file = hook_dir / f"{TerraformStage.PRE}_{TerraformAction.PLAN}"
+        hook_file.touch(mode=0o755)
+        args = (TerraformStage.PRE, str(tmp_path), TerraformAction.PLAN)
+        assert hooks.check_hooks(*args) is True
+        with mock.patch("tfworker.util.hooks.os.path.isdir") as mock_isdir:
+            assert hooks.check_hooks(*args) is True
+            mock_isdir.assert_not_called()
+
 
 # Test for `hook_exec`
 class TestHookExec:
@@ -202,22 +292,50 @@ class TestHookExec:
         mock_remote_vars.assert_called_once()
         mock_extra_vars.assert_called_once()
         mock_execute.assert_called_once()
+        assert mock_execute.call_args.kwargs["stream_output"] is True
+
+    @mock.patch("tfworker.util.hooks.clear_output_cache")
+    @mock.patch("tfworker.util.hooks._prepare_environment")
+    @mock.patch("tfworker.util.hooks._find_hook_script")
+    @mock.patch("tfworker.util.hooks._populate_environment_with_terraform_variables")
+    @mock.patch("tfworker.util.hooks._populate_environment_with_terraform_remote_vars")
+    @mock.patch("tfworker.util.hooks._populate_environment_with_extra_vars")
+    @mock.patch("tfworker.util.hooks._execute_hook_script")
+    def test_hook_exec_keeps_output_cache(
+        self,
+        mock_execute,
+        mock_extra_vars,
+        mock_remote_vars,
+        mock_terraform_vars,
+        mock_find_script,
+        mock_prepare_env,
+        mock_clear_output_cache,
+    ):
+        hooks.hook_exec("phase", "command", "working_dir", {}, "terraform_path")
+        mock_clear_output_cache.assert_not_called()
 
 
 # Helper function tests
 class TestHelperFunctions:
     @mock.patch(
-        "tfworker.util.hooks.os.listdir",
-        return_value=[f"{TerraformStage.PRE}_{TerraformAction.PLAN}"],
+        "tfworker.util.hooks.os.path.isfile",
+        side_effect=lambda f: f == "working_dir/hooks/pre_plan",
     )
-    def test_find_hook_script(self, mock_listdir):
+    def test_find_hook_script(self, mock_isfile):
         result = hooks._find_hook_script(
             "working_dir", TerraformStage.PRE, TerraformAction.PLAN
         )
         assert result == "working_dir/hooks/pre_plan"
 
-    @mock.patch("tfworker.util.hooks.os.listdir", return_value=[])
-    def test_find_hook_script_no_dir(self, mock_listdir):
+    def test_find_hook_script_scan(self, tmp_path):
+        (tmp_path / "hooks").mkdir()
+        (tmp_path / "hooks" / "pre_plan.rb").touch()
+        result = hooks._find_hook_script(
+            str(tmp_path), TerraformStage.PRE, TerraformAction.PLAN
+        )
+        assert result == f"{tmp_path}/hooks/pre_plan.rb"
+
+    def test_find_hook_script_no_dir(self):
         with pytest.raises(HookError) as e:
             hooks._find_hook_script(
                 "working_dir", TerraformStage.PRE, TerraformAction.PLAN
@@ -230,6 +348,13 @@ class TestHelperFunctions:
         assert result["KEY"] == "value"
         assert result["TF_PATH"] == "terraform_path"
 
+    def test_set_hook_env_var_b64(self):
+        local_env = {}
+        hooks._set_hook_env_var(
+            local_env, hooks.TFHookVarType.VAR, "key", '"value"', b64_encode=True
+        )
+        assert local_env["TF_VAR_KEY"] == "dmFsdWU="
+
     def test_set_hook_env_var(self):
         local_env = {}
         hooks._set_hook_env_var(
@@ -237,6 +362,24 @@ class TestHelperFunctions:
         )
         assert local_env["TF_VAR_KEY"] == "value"
 
+    @pytest.mark.parametrize(
+        "key, value, expected_key, expected_value",
+        [
+            (
+                'my-"key".name ',
+                'a "quoted"\nvalue',
+                "TF_VAR_MY_KEY_NAME",
+                "aquotedvalue",
+            ),
+            ("bytes", b'{"a": 1}', "TF_VAR_BYTES", "{a:1}"),
+            ("flag", True, "TF_VAR_FLAG", "TRUE"),
+        ],
+    )
+    def test_set_hook_env_var_sanitizes(self, key, value, expected_key, expected_value):
+        local_env = {}
+        hooks._set_hook_env_var(local_env, hooks.TFHookVarType.VAR, key, value, False)
+        assert local_env == {expected_key: expected_value}
+
     @mock.patch("tfworker.util.hooks.pipe_exec")
     def test_execute_hook_script(self, mock_pipe_exec, capsys):
         import tfworker.util.log as log
@@ -264,35 +407,76 @@ class TestHelperFunctions:
         assert "stdout: stdout" in captured_lines
         assert "stderr: stderr" in captured_lines
 
-    @mock.patch("tfworker.util.hooks.os.path.isfile", return_value=True)
-    @mock.patch(
-        "builtins.open",
-        new_callable=mock.mock_open,
-        read_data="key=value\nanother_key=another_value",
-    )
-    def test_populate_environment_with_terraform_variables(
-        self, mock_isfile, mock_open
-    ):
+    def test_populate_environment_with_terraform_variables(self, tmp_path):
+        (tmp_path / WORKER_TFVARS_FILENAME).write_text(
+            "key=value\nanother_key=another_value"
+        )
         local_env = {}
         hooks._populate_environment_with_terraform_variables(
-            local_env, "working_dir", "terraform_path", False
+            local_env, str(tmp_path), "terraform_path", False
         )
         assert "TF_VAR_KEY" in local_env
         assert "TF_VAR_ANOTHER_KEY" in local_env
 
-    @mock.patch("builtins.open", new_callable=mock.mock_open)
-    @mock.patch("tfworker.util.hooks.os.path.isfile", return_value=True)
+    def test_populate_environment_missing_files(self, tmp_path):
+        local_env = {}
+        hooks._populate_environment_with_terraform_variables(
+            local_env, str(tmp_path), "terraform_path", False
+        )
+        hooks._populate_environment_with_terraform_remote_vars(
+            local_env, str(tmp_path), "terraform_path", False
+        )
+        assert local_env == {}
+
+    def test_populate_environment_with_terraform_variables_partition(self, tmp_path):
+        (tmp_path / WORKER_TFVARS_FILENAME).write_text(
+            'key = "dmFsdWU="\n\nanother_key=a=b\n'
+        )
+        local_env = {}
+        hooks._populate_environment_with_terraform_variables(
+            local_env, str(tmp_path), "terraform_path", False
+        )
+        assert local_env == {"TF_VAR_KEY": "dmFsdWU=", "TF_VAR_ANOTHER_KEY": "a=b"}
+
+    def test_read_worker_file_cached(self, tmp_path):
+        path = tmp_path / WORKER_TFVARS_FILENAME
+        path.write_text("key=value")
+        parse = mock.Mock(side_effect=hooks._parse_terraform_variables)
+
+        assert hooks._read_worker_file(str(path), parse) == [("key", "value")]
+        assert hooks._read_worker_file(str(path), parse) == [("key", "value")]
+        parse.assert_called_once()
+
+        # a changed file is parsed again
+        path.write_text("key=other")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+        assert hooks._read_worker_file(str(path), parse) == [("key", "other")]
+        assert parse.call_count == 2
+
     @mock.patch(
-        "tfworker.util.hooks.get_state_item", side_effect=["value", "another_value"]
+        "tfworker.util.hooks.get_state_item",
+        side_effect=lambda wd, env, tf, state, item: {
+            "key": "value",
+            "another_key": "another_value",
+        }[item],
     )
+    @mock.patch("tfworker.util.hooks._load_state_outputs")
     def test_populate_environment_with_terraform_remote_vars(
-        self, mock_get_state_item, mock_isfile, mock_open, mock_terraform_locals
+        self,
+        mock_load_outputs,
+        mock_get_state_item,
+        mock_terraform_locals,
+        tmp_path,
     ):
-        mock_open.return_value.read.return_value = mock_terraform_locals
+        (tmp_path / WORKER_LOCALS_FILENAME).write_text(mock_terraform_locals)
 
         local_env = {}
         hooks._populate_environment_with_terraform_remote_vars(
-            local_env, "working_dir", "terraform_path", False
+            local_env, str(tmp_path), "terraform_path", False
+        )
+        # outputs are prefetched once for each unique state
+        assert mock_load_outputs.call_count == len(
+            {c.args[3] for c in mock_get_state_item.call_args_list}
         )
         assert "TF_REMOTE_LOCAL_KEY" in local_env.keys()
         assert "TF_REMOTE_LOCAL_ANOTHER_KEY" in local_env.keys()
@@ -304,3 +488,59 @@ class TestHelperFunctions:
         extra_vars = {"extra_key": "extra_value"}
         hooks._populate_environment_with_extra_vars(local_env, extra_vars, False)
         assert "TF_EXTRA_EXTRA_KEY" in local_env
+
+
+class TestStateCache:
+    STATE = {
+        "values": {
+            "root_module": {
+                "resources": [
+                    {
+                        "type": "terraform_remote_state",
+                        "name": "example",
+                        "values": {"outputs": {"key": "value"}},
+                    },
+                    {"type": "null_resource", "name": "other", "values": {}},
+                ]
+            }
+        }
+    }
+
+    def test_read_state_cache(self, tmp_path):
+        cache_file = tmp_path / "worker_state_cache.json"
+        cache_file.write_text(json.dumps(self.STATE))
+
+        index = hooks._read_state_cache(str(cache_file))
+        assert list(index.keys()) == ["example"]
+
+        # the parsed file is reused while it is unchanged
+        with mock.patch("builtins.open") as mock_open:
+            assert hooks._read_state_cache(str(cache_file)) is index
+            mock_open.assert_not_called()
+
+    def test_find_remote_state(self, tmp_path):
+        cache_file = tmp_path / "worker_state_cache.json"
+        cache_file.write_text(json.dumps(self.STATE))
+        index = hooks._read_state_cache(str(cache_file))
+
+        remote_state = hooks._find_remote_state(index, "example")
+        assert hooks._get_item_from_remote_state(remote_state, "example", "key") == (
+            '"value"'
+        )
+        with pytest.raises(HookError, match="Remote state item other not found"):
+            hooks._find_remote_state(index, "other")
+
+    @mock.patch("tfworker.util.hooks.pipe_exec")
+    def test_make_state_cache(self, mock_pipe_exec, tmp_path):
+        state_json = json.dumps(self.STATE).encode()
+        mock_pipe_exec.side_effect = [(0, b"", b""), (0, state_json, b"")]
+
+        hooks._make_state_cache(str(tmp_path), {}, "terraform_bin")
+        cache_file = hooks._get_state_cache_name(str(tmp_path))
+        with open(cache_file, "rb") as f:
+            assert f.read() == state_json
+        assert list(hooks._read_state_cache(cache_file).keys()) == ["example"]
+
+        # the cache is not rebuilt when it already exists
+        hooks._make_state_cache(str(tmp_path), {}, "terraform_bin")
+        assert mock_pipe_exec.call_count == 2
@@ -1,5 +1,6 @@
 from unittest.mock import patch
 
+import click
 import pytest
 
 import tfworker.util.log as log
@@ -249,43 +250,64 @@ terraform:
     )
 
 
-@patch("tfworker.util.log.secho")
-def test_log_no_redaction(mock_secho):
+@pytest.mark.parametrize(
+    "sensitive_string, redact, expected_result",
+    [
+        ("no secrets here", REDACTED_ITEMS, "no secrets here"),
+        ("aws_session_token='abc", REDACTED_ITEMS, "aws_session_token='REDACTED"),
+        ("key=one other=two", ["key", "other"], "key=REDACTED other=REDACTED"),
+        ("key=value", [], "key=value"),
+    ],
+)
+def test_redact_items_token_edge_cases(sensitive_string, redact, expected_result):
+    assert log.redact_items_token(sensitive_string, redact=redact) == expected_result
+
+
+def test_redact_items_no_keys_present():
+    sensitive_string = "aws_profile: default aws_region=us-east-1"
+    assert log.redact_items_token(sensitive_string) is sensitive_string
+    assert log.redact_items_re(sensitive_string) is sensitive_string
+
+
+@patch("tfworker.util.log.echo")
+def test_log_no_redaction(mock_echo):
     log.log_level = log.LogLevel.INFO
     log.log("This is a test message.", log.LogLevel.INFO)
-    mock_secho.assert_called_once_with("This is a test message.", fg="green")
+    mock_echo.assert_called_once_with(
+        click.style("This is a test message.", fg="green")
+    )
 
 
-@patch("tfworker.util.log.secho")
-def test_log_with_redaction(mock_secho):
+@patch("tfworker.util.log.echo")
+def test_log_with_redaction(mock_echo):
     log.log_level = log.LogLevel.INFO
     sensitive_string = """aws_secret_access_key="my_secret_key" aws_session_token 'my_session_token' aws_session_token:my_session_token"""
     expected_result = """aws_secret_access_key="REDACTED" aws_session_token 'REDACTED' aws_session_token:REDACTED"""
     log.log(sensitive_string, log.LogLevel.INFO, redact=True)
-    mock_secho.assert_called_once_with(expected_result, fg="green")
+    mock_echo.assert_called_once_with(click.style(expected_result, fg="green"))
 
 
-@patch("tfworker.util.log.secho")
-def test_partial_safe_info(mock_secho):
+@patch("tfworker.util.log.echo")
+def test_partial_safe_info(mock_echo):
     log.log_level = log.LogLevel.INFO
     sensitive_string = (
         """aws_secret_access_key="my_secret_key" aws_session_token my_session_token"""
     )
     expected_result = """aws_secret_access_key="REDACTED" aws_session_token REDACTED"""
     log.safe_info(sensitive_string)
-    mock_secho.assert_called_once_with(expected_result, fg="green")
+    mock_echo.assert_called_once_with(click.style(expected_result, fg="green"))
 
 
-@patch("tfworker.util.log.secho")
-def test_partial_info_no_redaction(mock_secho):
+@patch("tfworker.util.log.echo")
+def test_partial_info_no_redaction(mock_echo):
     log.log_level = log.LogLevel.INFO
     message = "This is an info message."
     log.info(message)
-    mock_secho.assert_called_once_with(message, fg="green")
+    mock_echo.assert_called_once_with(click.style(message, fg="green"))
 
 
-@patch("tfworker.util.log.secho")
-def test_log_levels(mock_secho):
+@patch("tfworker.util.log.echo")
+def test_log_levels(mock_echo):
     log.log_level = log.LogLevel.DEBUG
 
     trace_message = "This is a trace message."
@@ -295,42 +317,53 @@ def test_log_levels(mock_secho):
     error_message = "This is an error message."
 
     log.trace(trace_message)
-    assert not mock_secho.called  # TRACE should not appear since log_level is DEBUG
+    assert not mock_echo.called  # TRACE should not appear since log_level is DEBUG
 
     log.debug(debug_message)
-    mock_secho.assert_called_with(debug_message, fg="blue")
+    mock_echo.assert_called_with(click.style(debug_message, fg="blue"))
 
     log.info(info_message)
-    mock_secho.assert_called_with(info_message, fg="green")
+    mock_echo.assert_called_with(click.style(info_message, fg="green"))
 
     log.warn(warn_message)
-    mock_secho.assert_called_with(warn_message, fg="yellow")
+    mock_echo.assert_called_with(click.style(warn_message, fg="yellow"))
 
     log.error(error_message)
-    mock_secho.assert_called_with(error_message, fg="red")
+    mock_echo.assert_called_with(click.style(error_message, fg="red"))
 
     log.log_level = log.LogLevel.TRACE
 
     log.trace(trace_message)
-    mock_secho.assert_called_with(
-        trace_message, fg="cyan"
+    mock_echo.assert_called_with(
+        click.style(trace_message, fg="cyan")
     )  # TRACE should appear since log_level is TRACE
 
 
-@patch("tfworker.util.log.secho")
-def test_log_with_redaction_and_error_level(mock_secho):
+@patch("tfworker.util.log.redact_items_token")
+@patch("tfworker.util.log.echo")
+def test_suppressed_log_skips_redaction(mock_echo, mock_redact):
+    log.log_level = log.LogLevel.ERROR
+    log.safe_trace("aws_secret_access_key=secret")
+    assert not mock_echo.called
+    assert not mock_redact.called
+
+
+@patch("tfworker.util.log.echo")
+def test_log_with_redaction_and_error_level(mock_echo):
     log.log_level = log.LogLevel.INFO
     sensitive_string = "Error: aws_secret_access_key=my_secret_key"
     expected_result = "Error: aws_secret_access_key=REDACTED"
     log.log(sensitive_string, log.LogLevel.ERROR, redact=True)
-    mock_secho.assert_called_once_with(expected_result, fg="red")
+    mock_echo.assert_called_once_with(click.style(expected_result, fg="red"))
 
 
-@patch("tfworker.util.log.secho")
-def test_log_trace_level(mock_secho):
+@patch("tfworker.util.log.echo")
+def test_log_trace_level(mock_echo):
     log.log_level = log.LogLevel.TRACE
     log.log("This is a trace message.", log.LogLevel.TRACE)
-    mock_secho.assert_called_once_with("This is a trace message.", fg="cyan")
+    mock_echo.assert_called_once_with(
+        click.style("This is a trace message.", fg="cyan")
+    )
 
 
 # performance testing the two different redact methods
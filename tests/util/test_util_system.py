@@ -2,7 +2,7 @@ from unittest import mock
 
 import pytest
 
-from tfworker.util.system import get_platform, pipe_exec, strip_ansi
+from tfworker.util.system import _split_command, get_platform, pipe_exec, strip_ansi
 
 
 def mock_pipe_exec(args, stdin=None, cwd=None, env=None):
@@ -81,6 +81,73 @@ class TestUtilSystem:
         assert stdout.encode() in return_stdout.rstrip()
         assert return_stderr.rstrip() in stderr.encode()
 
+    def test_pipe_exec_argv(self):
+        """commands may be given as arguments, which are not split"""
+        (return_exit_code, return_stdout, _) = pipe_exec(("/bin/echo", "foo  bar"))
+        assert return_exit_code == 0
+        assert return_stdout == b"foo  bar\n"
+
+        (return_exit_code, return_stdout, _) = pipe_exec(
+            [("/bin/echo", "foo bar"), "/usr/bin/env grep -c 'foo bar'"]
+        )
+        assert return_exit_code == 0
+        assert return_stdout.rstrip() == b"1"
+
+    def test_pipe_exec_does_not_mutate_args(self):
+        args = ["/bin/echo foo", "/usr/bin/env grep foo"]
+        pipe_exec(args)
+        assert args == ["/bin/echo foo", "/usr/bin/env grep foo"]
+
+    @pytest.mark.timeout(10)
+    @pytest.mark.parametrize("stream_output", [False, True])
+    def test_pipe_exec_large_pipeline(self, stream_output, capsys):
+        """output larger than the pipe buffer must be drained while input is written"""
+        data = "x" * (1024 * 1024)
+        (return_exit_code, return_stdout, return_stderr) = pipe_exec(
+            ["/bin/cat", "/bin/cat"], stdin=data, stream_output=stream_output
+        )
+        assert return_exit_code == 0
+        assert return_stdout == data.encode()
+        assert return_stderr == b""
+
+    def test_pipe_exec_stream_lines(self, capsys):
+        # a small block size ensures lines are split across reads
+        with mock.patch("tfworker.util.system.STREAM_READ_SIZE", 4):
+            (return_exit_code, return_stdout, return_stderr) = pipe_exec(
+                "/usr/bin/env printf 'first line\\nsecond line\\npartial'",
+                stream_output=True,
+            )
+
+        assert return_exit_code == 0
+        assert return_stdout == b"first line\nsecond line\npartial"
+        assert return_stderr == b""
+        assert capsys.readouterr().out.splitlines() == [
+            "first line",
+            "second line",
+            "partial",
+        ]
+
+    def test_pipe_exec_on_line(self, capsys):
+        lines = []
+        (return_exit_code, return_stdout, _) = pipe_exec(
+            "/usr/bin/env printf 'foo\\nbar'", stream_output=True, on_line=lines.append
+        )
+        assert return_exit_code == 0
+        assert return_stdout == b"foo\nbar"
+        assert lines == [b"foo", b"bar"]
+        assert capsys.readouterr().out == ""
+
+    def test_pipe_exec_invalid_command(self):
+        # commands are split before any are started
+        with mock.patch("tfworker.util.system.subprocess.Popen") as mock_popen:
+            with pytest.raises(ValueError):
+                pipe_exec(["/bin/echo foo", "/usr/bin/env grep 'foo"])
+        mock_popen.assert_not_called()
+
+        # the started part of the pipeline is stopped when a command can not be run
+        with pytest.raises(FileNotFoundError):
+            pipe_exec(["/bin/cat", "/yisohwo0AhK8Ah"], stdin="foo")
+
     def test_strip_ansi(self):
         assert strip_ansi("\x1B[31mHello\x1B[0m") == "Hello"
         assert strip_ansi("\x1B[32mWorld\x1B[0m") == "World"
@@ -112,3 +179,20 @@ class TestUtilSystem:
                 assert machine == actual_machine
                 mock1.assert_called_once()
                 mock2.assert_called_once()
+
+    def test_get_platform_cached(self):
+        with mock.patch("platform.system", return_value="Linux") as mock_system:
+            with mock.patch("platform.machine", return_value="x86_64"):
+                assert get_platform() == ("linux", "amd64")
+                assert get_platform() == ("linux", "amd64")
+        mock_system.assert_called_once()
+
+    def test_split_command(self):
+        assert _split_command("terraform plan -var 'a=b c'") == (
+            "terraform",
+            "plan",
+            "-var",
+            "a=b c",
+        )
+        _split_command("terraform plan -var 'a=b c'")
+        assert _split_command.cache_info().hits == 1
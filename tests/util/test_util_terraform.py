@@ -0,0 +1,243 @@
+from unittest import mock
+
+import pytest
+
+import tfworker.util.terraform as tf
+from tfworker.exceptions import TFWorkerException
+
+
+@pytest.fixture
+def terraform_bin(tmp_path):
+    path = tmp_path / "terraform"
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+class TestGetTerraformVersion:
+    @pytest.mark.parametrize(
+        "stdout, expected",
+        [
+            (b"Terraform v1.5.7\non linux_amd64\n", (1, 5)),
+            (b"Terraform v0.13.7\n", (0, 13)),
+            (b"Terraform v1.10.0-beta1\non darwin_arm64\n", (1, 10)),
+        ],
+    )
+    def test_get_terraform_version(self, terraform_bin, stdout, expected):
+        with mock.patch(
+            "tfworker.util.terraform.pipe_exec", return_value=(0, stdout, b"")
+        ):
+            assert tf.get_terraform_version(terraform_bin) == expected
+
+    def test_get_terraform_version_invalid(self, terraform_bin):
+        with mock.patch(
+            "tfworker.util.terraform.pipe_exec", return_value=(0, b"unknown\n", b"")
+        ):
+            with pytest.raises(ValueError):
+                tf.get_terraform_version(terraform_bin, validation=True)
+
+    def test_get_terraform_version_failure(self, terraform_bin):
+        with mock.patch(
+            "tfworker.util.terraform.pipe_exec", return_value=(1, b"", b"error")
+        ):
+            with pytest.raises(ValueError):
+                tf.get_terraform_version(terraform_bin, validation=True)
+
+    def test_get_terraform_version_exit(self, terraform_bin, mock_click_context):
+        with mock.patch(
+            "tfworker.util.terraform.pipe_exec", return_value=(1, b"", b"error")
+        ):
+            with pytest.raises(SystemExit):
+                tf.get_terraform_version(terraform_bin)
+        mock_click_context.exit.assert_called_once_with(1)
+
+    def test_get_terraform_version_cached_by_binary(self, tmp_path, terraform_bin):
+        link = tmp_path / "terraform-link"
+        link.symlink_to(terraform_bin)
+        with mock.patch(
+            "tfworker.util.terraform.pipe_exec",
+            return_value=(0, b"Terraform v1.5.7\n", b""),
+        ) as mock_pipe_exec:
+            assert tf.get_terraform_version(terraform_bin) == (1, 5)
+            assert tf.get_terraform_version(str(link)) == (1, 5)
+        mock_pipe_exec.assert_called_once()
+
+    def test_get_terraform_version_binary_replaced(self, tmp_path, terraform_bin):
+        with mock.patch(
+            "tfworker.util.terraform.pipe_exec",
+            return_value=(0, b"Terraform v1.5.7\n", b""),
+        ):
+            assert tf.get_terraform_version(terraform_bin) == (1, 5)
+
+        replacement = tmp_path / "terraform.new"
+        replacement.write_text("#!/bin/sh\n# a newer terraform\n")
+        replacement.chmod(0o755)
+        replacement.replace(terraform_bin)
+        with mock.patch(
+            "tfworker.util.terraform.pipe_exec",
+            return_value=(0, b"Terraform v1.9.0\n", b""),
+        ):
+            assert tf.get_terraform_version(terraform_bin) == (1, 9)
+
+
+def mock_provider(name: str, version: str) -> mock.MagicMock:
+    provider = mock.MagicMock()
+    provider.name = name
+    provider.gid = f"registry.terraform.io/hashicorp/{name}"
+    provider.config.requirements.version = version
+    return provider
+
+
+class TestGenerateTerraformLockfile:
+    def test_generate_terraform_lockfile(self):
+        providers = {
+            "aws": mock_provider("aws", "5.0.0"),
+            "null": mock_provider("null", "3.2.1"),
+        }
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache", return_value=False
+        ), mock.patch(
+            "tfworker.util.terraform.tfhelpers._get_cached_hash",
+            side_effect=lambda gid, version, cache_dir: {
+                "5.0.0": ["h1:abc=", "zh:def"],
+                "3.2.1": ["h1:ghi="],
+            }[version],
+        ):
+            lockfile = tf.generate_terraform_lockfile(providers, None, "/cache")
+
+        assert lockfile == (
+            'provider "registry.terraform.io/hashicorp/aws" {\n'
+            '  version     = "5.0.0"\n'
+            '  constraints = "5.0.0"\n'
+            "  hashes = [\n"
+            '    "h1:abc=",\n'
+            '    "zh:def",\n'
+            "  ]\n"
+            "}\n"
+            "\n"
+            'provider "registry.terraform.io/hashicorp/null" {\n'
+            '  version     = "3.2.1"\n'
+            '  constraints = "3.2.1"\n'
+            "  hashes = [\n"
+            '    "h1:ghi=",\n'
+            "  ]\n"
+            "}\n"
+        )
+
+    def test_generate_terraform_lockfile_included(self):
+        providers = {
+            "aws": mock_provider("aws", "5.0.0"),
+            "null": mock_provider("null", "3.2.1"),
+        }
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache", return_value=False
+        ), mock.patch(
+            "tfworker.util.terraform.tfhelpers._get_cached_hash",
+            return_value=["h1:ghi="],
+        ):
+            lockfile = tf.generate_terraform_lockfile(providers, ["null"], "/cache")
+
+        assert "hashicorp/aws" not in lockfile
+        assert lockfile.startswith('provider "registry.terraform.io/hashicorp/null" {')
+
+    def test_generate_terraform_lockfile_not_in_cache(self):
+        providers = {"aws": mock_provider("aws", "5.0.0")}
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache", return_value=True
+        ):
+            assert tf.generate_terraform_lockfile(providers, None, "/cache") is None
+
+    def test_generate_terraform_lockfile_excluded_not_in_cache(self):
+        providers = {
+            "aws": mock_provider("aws", "5.0.0"),
+            "null": mock_provider("null", "3.2.1"),
+        }
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache",
+            side_effect=lambda gid, version, cache_dir: "aws" in gid,
+        ) as mock_not_in_cache, mock.patch(
+            "tfworker.util.terraform.tfhelpers._get_cached_hash",
+            return_value=["h1:ghi="],
+        ):
+            lockfile = tf.generate_terraform_lockfile(providers, ["null"], "/cache")
+
+        assert lockfile is not None
+        assert "hashicorp/aws" not in lockfile
+        mock_not_in_cache.assert_called_once()
+
+
+class TestMirrorProviders:
+    def test_mirror_providers_all_cached(self, tmp_path):
+        providers = {"aws": mock_provider("aws", "5.0.0")}
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache", return_value=False
+        ), mock.patch("tfworker.util.terraform.pipe_exec") as mock_pipe_exec:
+            tf.mirror_providers(providers, "terraform", str(tmp_path), "/cache")
+        mock_pipe_exec.assert_not_called()
+
+    def test_mirror_providers(self, tmp_path):
+        providers = mock.MagicMock()
+        providers.values.return_value = [mock_provider("aws", "5.0.0")]
+        providers.required_hcl.return_value = "  required_providers {}"
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache", return_value=True
+        ), mock.patch(
+            "tfworker.util.terraform.pipe_exec", return_value=(0, b"", b"")
+        ) as mock_pipe_exec:
+            tf.mirror_providers(providers, "terraform", str(tmp_path), "/cache")
+        mock_pipe_exec.assert_called_once()
+        providers.required_hcl.assert_called_once_with(includes=["aws"])
+
+    def test_mirror_providers_parallel(self, tmp_path):
+        providers = mock.MagicMock()
+        providers.values.return_value = [
+            mock_provider("aws", "5.0.0"),
+            mock_provider("null", "3.2.1"),
+        ]
+        providers.required_hcl.return_value = "  required_providers {}"
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache", return_value=True
+        ), mock.patch(
+            "tfworker.util.terraform.pipe_exec", return_value=(0, b"", b"")
+        ) as mock_pipe_exec:
+            tf.mirror_providers(providers, "terraform", str(tmp_path), "/cache")
+        assert mock_pipe_exec.call_count == 2
+        # every provider is mirrored from its own configuration
+        assert len({c.kwargs["cwd"] for c in mock_pipe_exec.call_args_list}) == 2
+        providers.required_hcl.assert_any_call(includes=["aws"])
+        providers.required_hcl.assert_any_call(includes=["null"])
+
+    def test_mirror_providers_failure(self, tmp_path):
+        providers = mock.MagicMock()
+        providers.values.return_value = [mock_provider("aws", "5.0.0")]
+        providers.required_hcl.return_value = "  required_providers {}"
+        with mock.patch(
+            "tfworker.util.terraform.tfhelpers._not_in_cache", return_value=True
+        ), mock.patch(
+            "tfworker.util.terraform.pipe_exec", return_value=(1, b"", b"error")
+        ):
+            with pytest.raises(TFWorkerException):
+                tf.mirror_providers(providers, "terraform", str(tmp_path), "/cache")
+
+
+class TestGetProviderGidFromSource:
+    @pytest.mark.parametrize(
+        "source, expected",
+        [
+            ("aws", ("registry.terraform.io", "hashicorp", "aws")),
+            (
+                "integrations/github",
+                ("registry.terraform.io", "integrations", "github"),
+            ),
+            ("example.com/org/custom", ("example.com", "org", "custom")),
+            ("a//b", ("a", "", "b")),
+        ],
+    )
+    def test_get_provider_gid_from_source(self, source, expected):
+        gid = tf.get_provider_gid_from_source(source)
+        assert (gid.hostname, gid.namespace, gid.type) == expected
+
+    @pytest.mark.parametrize("source", [None, "", "a/b/c/d"])
+    def test_get_provider_gid_from_source_invalid(self, source):
+        with pytest.raises(ValueError):
+            tf.get_provider_gid_from_source(source)
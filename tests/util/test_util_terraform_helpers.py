@@ -1,11 +1,12 @@
 import json
 import pathlib
 from tempfile import TemporaryDirectory
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 from packaging.specifiers import SpecifierSet
 
+import tfworker.util.terraform_helpers as tfhelpers
 from tfworker.exceptions import TFWorkerException
 from tfworker.providers import ProviderGID
 from tfworker.providers.collection import ProvidersCollection
@@ -13,8 +14,11 @@ from tfworker.util.system import get_platform
 from tfworker.util.terraform_helpers import (
     _create_mirror_configuration,
     _find_required_providers,
+    _find_tf_files,
     _get_cached_hash,
     _get_provider_cache_dir,
+    _list_provider_dir,
+    _load_version_file,
     _not_in_cache,
     _parse_required_providers,
     _write_mirror_configuration,
@@ -113,6 +117,14 @@ class TestTerraformHelpersNotInCache:
         provider_file.unlink()  # Remove the provider file
         assert _not_in_cache(provider_gid, version, str(cache_dir))
 
+    def test_not_in_cache_scans_directory_once(
+        self, provider_gid, version, create_cache_files
+    ):
+        cache_dir, _, _ = create_cache_files
+        assert not _not_in_cache(provider_gid, version, str(cache_dir))
+        assert _not_in_cache(provider_gid, "2.0.0", str(cache_dir))
+        assert _list_provider_dir.cache_info().misses == 1
+
 
 class TestTerraformHelpersGetCachedHash:
     def test_get_cached_hash(self, provider_gid, version, create_cache_files):
@@ -120,6 +132,14 @@ class TestTerraformHelpersGetCachedHash:
         cached_hash = _get_cached_hash(provider_gid, version, str(cache_dir))
         assert cached_hash == "dummy_hash"
 
+    def test_get_cached_hash_reads_once(
+        self, provider_gid, version, create_cache_files
+    ):
+        cache_dir, _, _ = create_cache_files
+        _get_cached_hash(provider_gid, version, str(cache_dir))
+        _get_cached_hash(provider_gid, version, str(cache_dir))
+        assert _load_version_file.cache_info().misses == 1
+
 
 class TestTerraformHelpersGetProviderCacheDir:
     def test_get_provider_cache_dir(self, provider_gid, cache_dir):
@@ -130,7 +150,7 @@ class TestTerraformHelpersGetProviderCacheDir:
             / provider_gid.namespace
             / provider_gid.type
         )
-        assert provider_cache_dir == expected_dir
+        assert provider_cache_dir == str(expected_dir)
 
 
 class TestTerraformHelpersWriteMirrorConfiguration:
@@ -195,7 +215,6 @@ class TestTerraformHelpersParseRequiredProviders:
 
 
 class TestTerraformHelpersFindRequiredProviders:
-
     def test_find_required_providers(self, tmp_path):
         tf_content = """
         terraform {
@@ -325,3 +344,125 @@ class TestTerraformHelpersFindRequiredProviders:
             f.write(tf_content_b)
         with pytest.raises(TFWorkerException):
             _find_required_providers(str(tmp_path))
+
+    def test_find_required_providers_skips_files_without_providers(self, tmp_path):
+        (tmp_path / "main.tf").write_text('resource "null_resource" "test" {}\n')
+
+        with patch("hcl2.loads") as mock_loads:
+            providers = _find_required_providers(str(tmp_path))
+        mock_loads.assert_not_called()
+        assert providers == {}
+
+    def test_find_required_providers_invalid_hcl_with_providers(self, tmp_path):
+        (tmp_path / "main.tf").write_text("terraform { required_providers { !! }\n")
+
+        providers = _find_required_providers(str(tmp_path))
+        assert providers == {}
+
+    def test_find_required_providers_cached_parse(self, tmp_path):
+        tf_content = """
+        terraform {
+            required_providers {
+                provider1 = {
+                source = "hashicorp/provider1"
+                version = "1.0.0"
+                }
+            }
+        }
+        """
+        (tmp_path / "main.tf").write_text(tf_content)
+
+        first = _find_required_providers(str(tmp_path))
+        with patch("hcl2.loads") as mock_loads:
+            second = _find_required_providers(str(tmp_path))
+        mock_loads.assert_not_called()
+        assert first == second
+
+    def test_find_required_providers_changed_file(self, tmp_path):
+        tf_content = """
+        terraform {
+            required_providers {
+                provider1 = {
+                source = "hashicorp/provider1"
+                version = "VERSION"
+                }
+            }
+        }
+        """
+        test_file = tmp_path / "main.tf"
+        test_file.write_text(tf_content.replace("VERSION", "1.0.0"))
+        _find_required_providers(str(tmp_path))
+
+        test_file.write_text(tf_content.replace("VERSION", "1.10.0"))
+        providers = _find_required_providers(str(tmp_path))
+        assert providers["provider1"]["version"] == SpecifierSet("==1.10.0")
+
+    def test_find_required_providers_many_files(self, tmp_path):
+        for i in range(20):
+            module_dir = tmp_path / f"module{i}"
+            module_dir.mkdir()
+            (module_dir / "main.tf").write_text(
+                "terraform {\n"
+                "  required_providers {\n"
+                f"    provider{i} = {{\n"
+                f'      source = "hashicorp/provider{i}"\n'
+                '      version = "1.0.0"\n'
+                "    }\n"
+                "  }\n"
+                "}\n"
+            )
+            (module_dir / "variables.tf").write_text('variable "test" {}\n')
+
+        providers = _find_required_providers(str(tmp_path))
+        assert sorted(providers) == sorted(f"provider{i}" for i in range(20))
+        assert providers["provider3"]["source"] == "hashicorp/provider3"
+
+
+class TestTerraformHelpersFindTfFiles:
+    def test_find_tf_files(self, tmp_path):
+        (tmp_path / "main.tf").write_text("")
+        (tmp_path / "README.md").write_text("")
+        nested = tmp_path / "modules" / "nested"
+        nested.mkdir(parents=True)
+        (nested / "nested.tf").write_text("")
+        linked = tmp_path.parent / f"{tmp_path.name}-linked"
+        linked.mkdir()
+        (linked / "linked.tf").write_text("")
+        (tmp_path / "link").symlink_to(linked)
+
+        assert sorted(_find_tf_files(str(tmp_path))) == sorted(
+            [
+                str(tmp_path / "main.tf"),
+                str(nested / "nested.tf"),
+                str(tmp_path / "link" / "linked.tf"),
+            ]
+        )
+
+    def test_find_tf_files_missing_dir(self, tmp_path):
+        assert _find_tf_files(str(tmp_path / "missing")) == []
+
+
+class TestTerraformHelpersCombineSpecifiers:
+    def test_find_required_providers_repeated_version(self, tmp_path):
+        tf_content = """
+        terraform {
+            required_providers {
+                provider1 = {
+                source = "hashicorp/provider1"
+                version = ">= 1.0"
+                }
+            }
+        }
+        """
+        for i in range(3):
+            module_dir = tmp_path / f"module{i}"
+            module_dir.mkdir()
+            (module_dir / "main.tf").write_text(tf_content)
+
+        with patch(
+            "tfworker.util.terraform_helpers._get_specifier_set",
+            wraps=tfhelpers._get_specifier_set,
+        ) as mock_get_specifier_set:
+            providers = _find_required_providers(str(tmp_path))
+        mock_get_specifier_set.assert_called_once_with(">= 1.0")
+        assert providers["provider1"]["version"] == SpecifierSet(">= 1.0")
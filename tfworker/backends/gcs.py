@@ -17,6 +17,16 @@ if TYPE_CHECKING:
         AuthenticatorsCollection,
     )
 
+# the configuration of a single remote data source, see GCSBackend.data_hcl
+_REMOTE_DATA_TPL = """\
+data "terraform_remote_state" "{remote}" {{
+  backend = "gcs"
+  config = {{
+    bucket = "{bucket}"
+    prefix = "{prefix}/{remote}"
+{credentials}  }}
+}}"""
+
 
 class GCSBackend(BaseBackend):
     tag = "gcs"
@@ -92,7 +102,7 @@ class GCSBackend(BaseBackend):
             if name != "default.tfstate":
                 raise BackendError(f"unexpected item found in state bucket: {b.name}")
 
-            state = json.loads(b.download_as_string().decode("utf-8"))
+            state = json.loads(b.download_as_string())
             if validate_backend_empty(state):
                 b.delete()
                 click.secho(f"empty state file {b.name} removed", fg="green")
@@ -174,22 +184,17 @@ class GCSBackend(BaseBackend):
         return "\n".join(state_config)
 
     def data_hcl(self, remotes: list) -> str:
-        remote_data_config = []
         if type(remotes) is not list:
             raise ValueError("remotes must be a list")
 
-        for remote in set(remotes):
-            remote_data_config.append(f'data "terraform_remote_state" "{remote}" {{')
-            remote_data_config.append('  backend = "gcs"')
-            remote_data_config.append("  config = {")
-            remote_data_config.append(f'    bucket = "{self._authenticator.bucket}"')
-            remote_data_config.append(
-                f'    prefix = "{self._authenticator.prefix}/{remote}"'
+        credentials = ""
+        if self._authenticator.creds_path:
+            credentials = f'    credentials = "{self._authenticator.creds_path}"\n'
+        bucket = self._authenticator.bucket
+        prefix = self._authenticator.prefix
+        return "\n".join(
+            _REMOTE_DATA_TPL.format(
+                remote=remote, bucket=bucket, prefix=prefix, credentials=credentials
             )
-            if self._authenticator.creds_path:
-                remote_data_config.append(
-                    f'    credentials = "{self._authenticator.creds_path}"'
-                )
-            remote_data_config.append("  }")
-            remote_data_config.append("}")
-        return "\n".join(remote_data_config)
+            for remote in set(remotes)
+        )
@@ -1,7 +1,8 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
-from typing import TYPE_CHECKING, Generator
+from typing import TYPE_CHECKING, Generator, List, Union
 
 import boto3.dynamodb
 import botocore
@@ -23,6 +24,23 @@ if TYPE_CHECKING:
         AWSAuthenticator,
     )
 
+# the most keys that can be removed with a single delete_objects request
+S3_DELETE_BATCH_SIZE = 1000
+# the number of state files fetched concurrently while cleaning the backend
+S3_STATE_FETCH_WORKERS = 32
+
+# the configuration of a single remote data source, see S3Backend.data_hcl
+_REMOTE_DATA_TPL = """\
+data "terraform_remote_state" "{remote}" {{
+  backend = "s3"
+  config = {{
+    region = "{region}"
+    bucket = "{bucket}"
+    key = "{prefix}/{remote}/terraform.tfstate"
+  }}
+}}
+"""
+
 
 class S3Backend(BaseBackend):
     """
@@ -83,6 +101,11 @@ class S3Backend(BaseBackend):
     def remotes(self) -> list:
         return list(self._bucket_files)
 
+    @property
+    def s3_client(self) -> Union["botocore.client.S3", None]:
+        """The S3 client of the backend session, None when no deployment was given"""
+        return getattr(self, "_s3_client", None)
+
     def clean(self, deployment: str, limit: tuple = None) -> None:
         """
         clean handles determining the desired items to clean and acts as a director to the
@@ -126,26 +149,17 @@ class S3Backend(BaseBackend):
         rendered_prefix = self._app_state.root_options.backend_prefix.format(
             deployment=self._app_state.deployment
         )
-        remote_data_config = []
         if type(remotes) is not list:
             raise ValueError("remotes must be a list")
 
-        for remote in set(remotes):
-            remote_data_config.append(f'data "terraform_remote_state" "{remote}" {{')
-            remote_data_config.append('  backend = "s3"')
-            remote_data_config.append("  config = {")
-            remote_data_config.append(
-                f'    region = "{self._app_state.root_options.backend_region}"'
+        region = self._app_state.root_options.backend_region
+        bucket = self._app_state.root_options.backend_bucket
+        return "\n".join(
+            _REMOTE_DATA_TPL.format(
+                remote=remote, region=region, bucket=bucket, prefix=rendered_prefix
             )
-            remote_data_config.append(
-                f'    bucket = "{self._app_state.root_options.backend_bucket}"'
-            )
-            remote_data_config.append(
-                "    key =" f' "{rendered_prefix}/{remote}/terraform.tfstate"'
-            )
-            remote_data_config.append("  }")
-            remote_data_config.append("}\n")
-        return "\n".join(remote_data_config)
+            for remote in set(remotes)
+        )
 
     def hcl(self, deployment: str) -> str:
         """
@@ -267,21 +281,43 @@ class S3Backend(BaseBackend):
         else:
             prefix = f"{self._authenticator.prefix}/{definition}"
 
-        for s3_object in self.filter_keys(
-            s3_paginator, self._authenticator.bucket, prefix
-        ):
-            backend_file = self._s3_client.get_object(
-                Bucket=self._authenticator.bucket, Key=s3_object
+        # the state files are fetched concurrently but checked in order; empty state
+        # files are removed in batches, every file validated before a state that is
+        # not empty is still removed
+        empty = []
+        with ThreadPoolExecutor(max_workers=S3_STATE_FETCH_WORKERS) as executor:
+            keys = list(
+                self.filter_keys(s3_paginator, self._authenticator.bucket, prefix)
             )
-            body = backend_file["Body"]
-            with closing(backend_file["Body"]):
-                backend = json.load(body)
+            for s3_object, backend in zip(keys, executor.map(self._get_state, keys)):
+                if not validate_backend_empty(backend):
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._delete_with_versions(empty)
+                    raise BackendError(f"state file at: {s3_object} is not empty")
 
-            if validate_backend_empty(backend):
-                self._delete_with_versions(s3_object)
-                log.info(f"backend file removed: {s3_object}")
-            else:
-                raise BackendError(f"state file at: {s3_object} is not empty")
+                empty.append(s3_object)
+                if len(empty) == S3_DELETE_BATCH_SIZE:
+                    self._delete_with_versions(empty)
+                    empty = []
+
+        self._delete_with_versions(empty)
+
+    def _get_state(self, key: str) -> dict:
+        """
+        Fetch and parse a terraform state file from the backend bucket
+
+        Args:
+            key (str): The key of the state file
+
+        Returns:
+            dict: The parsed state
+        """
+        backend_file = self._s3_client.get_object(
+            Bucket=self._authenticator.bucket, Key=key
+        )
+        body = backend_file["Body"]
+        with closing(body):
+            return json.loads(body.read())
 
     def _clean_locking_state(self, deployment: str, definition: str = None) -> None:
         """
@@ -406,14 +442,34 @@ class S3Backend(BaseBackend):
             TableName=name, WaiterConfig={"Delay": 10, "MaxAttempts": 30}
         )
 
-    def _delete_with_versions(self, key: str) -> None:
+    def _delete_with_versions(self, keys: List[str]) -> None:
         """
-        _delete_with_versions should handle object deletions, and all references / versions of the object
+        _delete_with_versions should handle object deletions, and all references / versions of the objects,
+        the objects are removed with a single request
 
         note: in initial testing this isn't required, but is inconsistent with how S3 delete markers, and the boto
         delete object call work there may be some configurations that require extra handling.
+
+        Args:
+            keys (List[str]): The keys to remove, at most S3_DELETE_BATCH_SIZE
+
+        Raises:
+            BackendError: An error occurred while removing any of the objects
         """
-        self._s3_client.delete_object(Bucket=self._authenticator.bucket, Key=key)
+        if not keys:
+            return
+
+        result = self._s3_client.delete_objects(
+            Bucket=self._authenticator.bucket,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        errors = result.get("Errors", ())
+        if errors:
+            raise BackendError(
+                f"error removing backend files: {', '.join(e['Key'] + ': ' + e['Message'] for e in errors)}"
+            )
+        for key in keys:
+            log.info(f"backend file removed: {key}")
 
     def _ensure_backend_bucket(self) -> None:
         """
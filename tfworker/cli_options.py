@@ -351,6 +351,12 @@ class CLIOptionsTerraform(FreezableBaseModel):
         json_schema_extra={"env": "WORKER_BACKEND_USE_ALL_REMOTES"},
         description="Generate remote data sources based on all definition paths present in the backend",
     )
+    parallelism: int = Field(
+        1,
+        ge=1,
+        json_schema_extra={"env": "WORKER_PARALLELISM"},
+        description="Number of definitions to init and plan concurrently, apply and destroy always run serially; streamed output is prefixed with the definition name",
+    )
 
     @model_validator(mode="before")
     @classmethod
@@ -452,12 +458,17 @@ def validate_existing_dir(fpath: Union[str, None], empty=False) -> Union[str, No
         fpath = os.path.abspath(fpath)
     if not os.path.isdir(fpath):
         raise ValueError(f"path {fpath} does not exist!")
-    if not os.access(fpath, os.W_OK):
-        raise ValueError(f"Ppath {fpath} is not writeable!")
-    if not os.access(fpath, os.R_OK):
+    # check both permissions at once, the individual checks are only needed to
+    # report which one is missing
+    if not os.access(fpath, os.W_OK | os.R_OK):
+        if not os.access(fpath, os.W_OK):
+            raise ValueError(f"Ppath {fpath} is not writeable!")
         raise ValueError(f"path {fpath} is not readable!")
-    if empty and any(os.listdir(fpath)):
-        raise ValueError(f"path {fpath} must be empty!")
+    if empty:
+        # stop at the first entry rather than listing the whole directory
+        with os.scandir(fpath) as it:
+            if next(it, None) is not None:
+                raise ValueError(f"path {fpath} must be empty!")
     return fpath
 
 
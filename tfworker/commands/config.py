@@ -6,7 +6,6 @@ import pathlib
 from typing import Any, Dict, List, Type, Union
 
 import click
-import hcl2
 import jinja2
 import yaml
 from jinja2.runtime import StrictUndefined
@@ -19,6 +18,13 @@ from tfworker.util.cli import handle_config_error
 
 from .. import cli_options
 
+# use the libyaml bindings when they are available, they are much faster than the
+# pure python loader
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _YamlLoader
+
 
 def load_config(config_file: str, config_vars: Dict[str, str]) -> ConfigFile:
     """
@@ -35,9 +41,14 @@ def load_config(config_file: str, config_vars: Dict[str, str]) -> ConfigFile:
     rendered_config = _process_template(config_file, _get_full_config_vars(config_vars))
     log.safe_trace(f"rendered config: {json.dumps(rendered_config)}")
     if config_file.endswith(".hcl"):
+        # the HCL parser is slow to import, most configurations are YAML
+        import hcl2
+
         loaded_config: Dict[Any, Any] = hcl2.loads(rendered_config)["terraform"]
     else:
-        loaded_config: Dict[Any, Any] = yaml.safe_load(rendered_config)["terraform"]
+        loaded_config: Dict[Any, Any] = yaml.load(rendered_config, Loader=_YamlLoader)[
+            "terraform"
+        ]
 
     try:
         parsed_config = ConfigFile.model_validate(loaded_config)
@@ -1,5 +1,10 @@
 import os
-from typing import TYPE_CHECKING, Dict, Union
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Union
+
+import click
 
 import tfworker.util.hooks as hooks
 import tfworker.util.log as log
@@ -66,7 +71,7 @@ class TerraformCommand(BaseCommand):
 
         def_prep = DefinitionPrepare(self.app_state)
 
-        for name in self.app_state.definitions.keys():
+        def init(name: str) -> None:
             log.info(f"initializing definition: {name}")
             def_prep.copy_files(name=name)
             try:
@@ -74,8 +79,11 @@ class TerraformCommand(BaseCommand):
                 def_prep.create_local_vars(name=name)
                 def_prep.create_terraform_vars(name=name)
                 def_prep.create_worker_tf(name=name)
+                # the output of concurrent downloads is not streamed, it would interleave
                 def_prep.download_modules(
-                    name=name, stream_output=self.terraform_config.stream_output
+                    name=name,
+                    stream_output=self.terraform_config.stream_output
+                    and not self._concurrent,
                 )
                 def_prep.create_terraform_lockfile(name=name)
             except TFWorkerException as e:
@@ -84,6 +92,8 @@ class TerraformCommand(BaseCommand):
 
             self._exec_terraform_action(name=name, action=TerraformAction.INIT)
 
+        self._run_definitions(init)
+
     def terraform_plan(self) -> None:
         if not self.app_state.terraform_options.plan:
             log.debug("--no-plan option specified; skipping plan")
@@ -91,25 +101,30 @@ class TerraformCommand(BaseCommand):
 
         from tfworker.definitions.plan import DefinitionPlan
 
-        needed: bool
-        reason: str
         def_plan: DefinitionPlan = DefinitionPlan(self.ctx, self.app_state)
 
-        for name in self.app_state.definitions.keys():
+        def plan(name: str) -> None:
+            needed: bool
+            reason: str
+
+            definition: Definition = self.app_state.definitions[name]
+
             log.info(f"running pre-plan for definition: {name}")
-            def_plan.set_plan_file(self.app_state.definitions[name])
+            def_plan.set_plan_file(definition)
             self._exec_terraform_pre_plan(name=name)
-            needed, reason = def_plan.needs_plan(self.app_state.definitions[name])
+            needed, reason = def_plan.needs_plan(definition)
 
             if not needed:
                 if "plan file exists" in reason:
-                    self.app_state.definitions[name].needs_apply = True
+                    definition.needs_apply = True
                 log.info(f"definition {name} does not need a plan: {reason}")
-                continue
+                return
 
             log.info(f"definition {name} needs a plan: {reason}")
             self._exec_terraform_plan(name=name)
 
+        self._run_definitions(plan)
+
     def terraform_apply_or_destroy(self) -> None:
         if self.app_state.terraform_options.destroy:
             action: TerraformAction = TerraformAction.DESTROY
@@ -119,19 +134,73 @@ class TerraformCommand(BaseCommand):
             log.debug("neither apply nor destroy specified; skipping")
             return
 
-        for name in self.app_state.definitions.keys():
+        limit = self.app_state.terraform_options.limit
+        limit_set = frozenset(limit) if limit else None
+        for name, definition in self.app_state.definitions.items():
             if action == TerraformAction.DESTROY:
-                if self.app_state.terraform_options.limit:
-                    if name not in self.app_state.terraform_options.limit:
+                if limit_set is not None:
+                    if name not in limit_set:
                         log.info(f"skipping destroy for definition: {name}")
                         continue
             log.trace(
-                f"running {action} for definition: {name} if needs_apply is True, value is: {self.app_state.definitions[name].needs_apply}"
+                f"running {action} for definition: {name} if needs_apply is True, value is: {definition.needs_apply}"
             )
-            if self.app_state.definitions[name].needs_apply:
+            if definition.needs_apply:
                 log.info(f"running apply for definition: {name}")
                 self._exec_terraform_action(name=name, action=action)
 
+    def _run_definitions(self, func: Callable[[str], None]) -> None:
+        """
+        Run a function for every definition, in order
+
+        When parallelism is greater than one the definitions are run concurrently
+        in a thread pool; terraform spends its time in subprocesses so the threads
+        do not contend for the GIL. The first failure cancels every definition
+        which has not started yet, and is raised once the running ones finish.
+
+        Args:
+            func (Callable[[str], None]): the function to call with each definition name
+        """
+        names = list(self.app_state.definitions.keys())
+        if not self._concurrent:
+            for name in names:
+                func(name)
+            return
+        workers = min(self.app_state.terraform_options.parallelism, len(names))
+
+        failed = threading.Event()
+
+        def run(name: str) -> None:
+            if failed.is_set():
+                return
+            # the click context is thread local, handlers and hooks look it up
+            with self.ctx.scope(cleanup=False):
+                try:
+                    func(name)
+                except BaseException:
+                    failed.set()
+                    raise
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run, name) for name in names]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                future.cancel()
+        for future in futures:
+            if not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+
+    @property
+    def _concurrent(self) -> bool:
+        """True when definitions are initialized and planned concurrently"""
+        return (
+            min(
+                self.app_state.terraform_options.parallelism,
+                len(self.app_state.definitions),
+            )
+            > 1
+        )
+
     def _exec_terraform_action(self, name: str, action: TerraformAction) -> None:
         """
         Execute terraform action
@@ -173,6 +242,10 @@ class TerraformCommand(BaseCommand):
             log.error(f"error running terraform {action.value} for {name}")
             self.ctx.exit(1)
 
+        if action in (TerraformAction.APPLY, TerraformAction.DESTROY):
+            # the outputs of the definition changed, hooks must read them again
+            hooks.clear_output_cache()
+
         try:
             log.trace(
                 f"executing {TerraformStage.POST.value} {action.value} handlers for definition {name}"
@@ -292,12 +365,18 @@ class TerraformCommand(BaseCommand):
             f"cmd: {self.app_state.terraform_options.terraform_bin} {action} {params}"
         )
 
+        # init and plan may run concurrently, label each line with its definition
+        on_line = None
+        if self._concurrent and action in (TerraformAction.INIT, TerraformAction.PLAN):
+            on_line = partial(_echo_definition_line, definition_name)
+
         result: TerraformResult = TerraformResult(
             *pipe_exec(
                 f"{self.app_state.terraform_options.terraform_bin} {action} {params}",
                 cwd=working_dir,
                 env=self.terraform_config.env,
                 stream_output=self.terraform_config.stream_output,
+                on_line=on_line,
             )
         )
 
@@ -349,6 +428,12 @@ class TerraformCommand(BaseCommand):
             self.ctx.exit(2)
 
 
+def _echo_definition_line(name: str, line: bytes) -> None:
+    """echo a line of streamed terraform output, prefixed with the definition name"""
+    # echo writes the line and its newline at once, so concurrent lines do not mix
+    click.echo(f"{name}: {line.decode(errors='replace').rstrip()}")
+
+
 class TerraformResult:
     """
     Hold the results of a terraform run
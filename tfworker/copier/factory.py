@@ -1,12 +1,22 @@
+import errno
+import os
+import shutil
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Callable, Type
 
+# errors from copy_file_range which mean the kernel can not copy between the files
+_COPY_FILE_RANGE_UNSUPPORTED = frozenset(
+    (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ETXTBSY)
+)
+
 
 class CopyFactory:
     """The factory class for creating copiers"""
 
     registry = {}
+    # copiers with cheap type matching are probed first, regardless of registration order
+    probe_order = ("fs", "git")
 
     @classmethod
     def register(cls, name: str) -> Callable[[Type["Copier"]], Type["Copier"]]:
@@ -48,8 +58,10 @@ class CopyFactory:
         Returns:
             str: the copier type
         """
-        for copier_type, copier_class in cls.registry.items():
-            if copier_class.type_match(source, **kwargs):
+        ordered = [x for x in cls.probe_order if x in cls.registry]
+        ordered.extend(x for x in cls.registry if x not in cls.probe_order)
+        for copier_type in ordered:
+            if cls.registry[copier_type].type_match(source, **kwargs):
                 return copier_type
         raise NotImplementedError(f"no valid copier for {source}")
 
@@ -57,23 +69,45 @@ class CopyFactory:
 class Copier(ABC):
     """The base class for definition copiers"""
 
+    __slots__ = (
+        "_source",
+        "_kwargs",
+        "_conflicts",
+        "_conflicts_set",
+        "_destination",
+        "_root_path",
+        "_temp_dir",
+        "_local_path",
+    )
+
     _register_name: str = None
 
     def __init__(self, source: str, **kwargs):
         self._source = source
-        self._kwargs = {}
-
-        for k, v in kwargs.items():
-            if k in ["conflicts", "destination", "root_path"]:
-                setattr(self, f"_{k}", v)
-            else:
-                self._kwargs[k] = v
-
-        self._kwargs = kwargs
-
-        if hasattr(self, "_conflicts"):
-            if type(self._conflicts) is not list:
-                raise ValueError("Conflicts must be a list of filenames to disallow")
+        self._conflicts = kwargs.get("conflicts")
+        self._destination = kwargs.get("destination")
+        self._root_path = kwargs.get("root_path")
+        self._temp_dir = None
+        self._local_path = None
+        self._kwargs = {
+            k: v
+            for k, v in kwargs.items()
+            if k not in ("conflicts", "destination", "root_path")
+        }
+
+        if self._conflicts is not None:
+            # a string is iterable, but is never a valid collection of filenames
+            if isinstance(self._conflicts, (str, bytes)):
+                raise ValueError(
+                    "Conflicts must be an iterable of filenames to disallow"
+                )
+            try:
+                self._conflicts = list(self._conflicts)
+            except TypeError:
+                raise ValueError(
+                    "Conflicts must be an iterable of filenames to disallow"
+                ) from None
+        self._conflicts_set = frozenset(self.conflicts)
 
     @staticmethod
     @abstractmethod
@@ -89,7 +123,7 @@ class Copier(ABC):
     @property
     def root_path(self):
         """root_path returns an optional root path to use for relative file operations"""
-        if hasattr(self, "_root_path"):
+        if self._root_path is not None:
             return self._root_path
         else:
             return ""
@@ -97,7 +131,7 @@ class Copier(ABC):
     @property
     def conflicts(self):
         """conflicts returns a list of disallowed files"""
-        if hasattr(self, "_conflicts"):
+        if self._conflicts is not None:
             return self._conflicts
         else:
             return []
@@ -109,7 +143,7 @@ class Copier(ABC):
 
     def get_destination(self, make_dir: bool = True, **kwargs) -> str:
         """get_destination returns the destination path, and optionally makes the destination directory"""
-        if not (hasattr(self, "_destination") or "destination" in kwargs.keys()):
+        if self._destination is None and "destination" not in kwargs:
             raise ValueError("no destination provided")
         if "destination" in kwargs:
             d = kwargs["destination"]
@@ -122,14 +156,33 @@ class Copier(ABC):
 
         return d
 
+    @staticmethod
+    def fast_copy(src: str, dst: str, *, follow_symlinks: bool = True) -> str:
+        """fast_copy copies a file inside the kernel with copy_file_range, cloning it where the file system supports it; it is a drop in copy_function for shutil.copytree"""
+        if not hasattr(os, "copy_file_range") or (
+            not follow_symlinks and os.path.islink(src)
+        ):
+            return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 2**30):
+                    pass
+        except OSError as e:
+            if e.errno not in _COPY_FILE_RANGE_UNSUPPORTED:
+                raise
+            return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+        shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+        return dst
+
     def check_conflicts(self, path: str) -> None:
         """Checks for files with conflicting names in a path"""
         conflicting = []
-        if self.conflicts:
-            check_path = Path(path)
-            for check_file in check_path.glob("*"):
-                if check_file.name in self.conflicts:
-                    conflicting.append(check_file.name)
+        if self._conflicts_set:
+            try:
+                with os.scandir(path) as it:
+                    conflicting = [e.name for e in it if e.name in self._conflicts_set]
+            except (FileNotFoundError, NotADirectoryError):
+                pass
 
         if conflicting:
             raise FileExistsError(f"{','.join(conflicting)}")
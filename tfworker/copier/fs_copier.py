@@ -1,14 +1,22 @@
 import os
 import re
 import shutil
+import stat
 
 import tfworker.util.log as log
 
 from .factory import Copier
 
+_SLASH_RE = re.compile(r"/+")
+
 
 class FileSystemCopier(Copier):
+    __slots__ = ()
+
     _register_name = "fs"
+    # the (source, root_path) pairs found on the file system, a missing source is not
+    # remembered so a directory created after it was first matched is still found
+    _found: set = set()
 
     def copy(self, **kwargs) -> None:
         """copy copies files from a local source on the file system to a destination path"""
@@ -20,12 +28,14 @@ class FileSystemCopier(Copier):
             source_path = self.local_path
         if not os.path.exists(source_path):
             raise FileNotFoundError(f"{source_path} does not exist")
-        shutil.copytree(source_path, dest, dirs_exist_ok=True)
+        shutil.copytree(
+            source_path, dest, dirs_exist_ok=True, copy_function=self.fast_copy
+        )
 
     @property
     def local_path(self):
         """local_path returns a complete local file system path"""
-        if not hasattr(self, "_local_path"):
+        if self._local_path is None:
             # try with the root path explicitly provided
             local_path = self.make_local_path(self.source, self.root_path)
             if os.path.exists(local_path):
@@ -38,24 +48,31 @@ class FileSystemCopier(Copier):
                 self._local_path = local_path
                 return self._local_path
 
-        if not hasattr(self, "_local_path"):
+        if self._local_path is None:
             raise FileNotFoundError(f"unable to find {self.source}")
 
         return self._local_path
 
     @staticmethod
     def type_match(source: str, **kwargs) -> bool:
-        # check if the source was provided as an absolute path
         log.trace(f"type_matching fs copier for {source}")
-        if os.path.isdir(source) or os.path.isfile(source):
-            return True
+        return FileSystemCopier._type_match(source, kwargs.get("root_path"))
 
-        # check if the source is relative to the root path
-        if "root_path" in kwargs:
-            source = FileSystemCopier.make_local_path(source, kwargs["root_path"])
+    @staticmethod
+    def _type_match(source: str, root_path: str) -> bool:
+        """_type_match probes the file system until the source is found once per root path"""
+        key = (source, root_path)
+        if key in FileSystemCopier._found:
+            return True
 
-            if os.path.isdir(source) or os.path.isfile(source):
-                return True
+        # check if the source was provided as an absolute path, or is relative to the
+        # root path
+        if _is_dir_or_file(source) or (
+            root_path is not None
+            and _is_dir_or_file(FileSystemCopier.make_local_path(source, root_path))
+        ):
+            FileSystemCopier._found.add(key)
+            return True
 
         return False
 
@@ -63,5 +80,14 @@ class FileSystemCopier(Copier):
     def make_local_path(source: str, root_path: str) -> str:
         """make_local_path appends together known path objects to provide a local path"""
         full_path = f"{root_path}/{source}"
-        full_path = re.sub(r"/+", "/", full_path)
+        full_path = _SLASH_RE.sub("/", full_path)
         return full_path
+
+
+def _is_dir_or_file(path: str) -> bool:
+    """_is_dir_or_file is os.path.isdir(path) or os.path.isfile(path) with a single stat call"""
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISDIR(mode) or stat.S_ISREG(mode)
@@ -1,15 +1,31 @@
+import atexit
 import os
 import re
+import secrets
 import shutil
 import tempfile
+import threading
 
 from tfworker.util.system import pipe_exec
 
 from .factory import Copier
 
+# sources which are unambiguously git remotes do not need to be probed with ls-remote
+_GIT_URL_RE = re.compile(r"^(git@|git://|ssh://|https?://.+\.git/?$)")
+# runs of whitespace left in the clone command by empty git_cmd or git_args
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 class GitCopier(Copier):
+    __slots__ = ()
+
     _register_name = "git"
+    # all clones share a single base temporary directory, removed at exit
+    _base_temp: str = None
+    _base_temp_lock = threading.Lock()
+    # the (source, git_cmd, git_args) probes which found a git remote, a failed probe
+    # may be transient so it is not remembered, the source is probed again next time
+    _remotes: set = set()
 
     def copy(self, **kwargs) -> None:
         """copy clones a remote git repo, and puts the requested files into the destination"""
@@ -35,10 +51,9 @@ class GitCopier(Copier):
         self.make_temp()
         temp_path = f"{self._temp_dir}/{sub_path}"
         exitcode, stdout, stderr = pipe_exec(
-            re.sub(
-                r"\s+",
+            _WHITESPACE_RE.sub(
                 " ",
-                f"{git_cmd} {git_args} clone {self._source} --branch {branch} --single-branch ./",
+                f"{git_cmd} {git_args} clone --depth 1 --branch {branch} --single-branch {self._source} ./",
             ),
             cwd=self._temp_dir,
         )
@@ -58,7 +73,7 @@ class GitCopier(Copier):
         if reset_repo:
             self.repo_clean(f"{temp_path}")
 
-        shutil.copytree(temp_path, dest, dirs_exist_ok=True)
+        self.move_tree(temp_path, dest)
         self.clean_temp()
 
     @staticmethod
@@ -76,26 +91,87 @@ class GitCopier(Copier):
         if "git_args" in kwargs:
             git_args = kwargs["git_args"]
 
+        if _GIT_URL_RE.match(source):
+            return True
+
+        return GitCopier._ls_remote(source, git_cmd, git_args)
+
+    @staticmethod
+    def _ls_remote(source: str, git_cmd: str, git_args: str) -> bool:
+        """_ls_remote probes the remote until it is found once, definitions commonly share a repository"""
+        key = (source, git_cmd, git_args)
+        if key in GitCopier._remotes:
+            return True
+
+        # never wait on an interactive credential prompt while probing
+        env = os.environ.copy()
+        env["GIT_TERMINAL_PROMPT"] = "0"
         try:
-            (return_code, _, _) = pipe_exec(f"{git_cmd} {git_args} ls-remote {source}")
+            (return_code, _, _) = pipe_exec(
+                f"{git_cmd} {git_args} ls-remote {source}", env=env
+            )
 
         except (PermissionError, FileNotFoundError):
             return False
         if return_code == 0:
+            GitCopier._remotes.add(key)
             return True
         return False
 
+    @staticmethod
+    def _get_base_temp() -> str:
+        """_get_base_temp lazily creates the base temporary directory shared by all git copiers"""
+        # definitions may be copied from several threads, only one may create it
+        with GitCopier._base_temp_lock:
+            if GitCopier._base_temp is None:
+                GitCopier._base_temp = tempfile.mkdtemp(prefix="tfworker-")
+                atexit.register(shutil.rmtree, GitCopier._base_temp, ignore_errors=True)
+        return GitCopier._base_temp
+
     def make_temp(self) -> None:
-        if hasattr(self, "_temp_dir"):
-            pass
-        else:
-            self._temp_dir = tempfile.mkdtemp()
+        """make_temp creates the temporary path used by this copier, if it does not already exist"""
+        if self._temp_dir is not None:
+            return
+        self._temp_dir = os.path.join(self._get_base_temp(), secrets.token_hex(8))
+        os.mkdir(self._temp_dir)
 
     def clean_temp(self) -> None:
         """clean_temp removes the temporary path used by this copier"""
-        if hasattr(self, "_temp_dir"):
+        if self._temp_dir is not None:
             shutil.rmtree(self._temp_dir, ignore_errors=True)
-            del self._temp_dir
+            self._temp_dir = None
+
+    @staticmethod
+    def move_tree(src: str, dest: str) -> None:
+        """move_tree moves the cloned files into the destination, falling back to a copy when a rename is not possible"""
+        # symlinks may point elsewhere in the clone, which is removed once the files are
+        # moved, so the contents of their targets are copied instead of the links
+        if _has_symlinks(src):
+            shutil.copytree(
+                src, dest, dirs_exist_ok=True, copy_function=GitCopier.fast_copy
+            )
+            return
+
+        try:
+            # a rename is a single metadata operation, but only works when the destination
+            # is empty and on the same file system as the temporary directory
+            os.rename(src, dest)
+        except OSError:
+            shutil.copytree(
+                src, dest, dirs_exist_ok=True, copy_function=GitCopier.link_or_copy
+            )
+
+    @staticmethod
+    def link_or_copy(src: str, dst: str, *, follow_symlinks: bool = True) -> str:
+        """link_or_copy hard links a cloned file into the destination, copying it when a link is not possible; the clone is removed afterwards so the link never aliases a file that is kept"""
+        # a symlink may point outside of the clone, only its content is copied
+        if not os.path.islink(src):
+            try:
+                os.link(src, dst)
+                return dst
+            except OSError:
+                pass
+        return GitCopier.fast_copy(src, dst, follow_symlinks=follow_symlinks)
 
     @staticmethod
     def repo_clean(p: str) -> None:
@@ -105,3 +181,16 @@ class GitCopier(Copier):
                 shutil.rmtree(f"{p}/{f}")
             except FileNotFoundError:
                 pass
+
+
+def _has_symlinks(path: str) -> bool:
+    """_has_symlinks checks if there are any symlinks in a directory tree"""
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_symlink():
+                    return True
+                if entry.is_dir():
+                    stack.append(entry.path)
+    return False
@@ -35,8 +35,7 @@ class DefinitionsCollection(Mapping):
         if not hasattr(self, "_initialized"):
             log.trace("initializing DefinitionsCollection")
             self._definitions = {}
-            if limiter is None:
-                limiter = []
+            limiter = frozenset(limiter) if limiter else frozenset()
             for definition, body in definitions.items():
                 # disallow commas in definition names
                 if "," in definition:
@@ -55,7 +54,7 @@ class DefinitionsCollection(Mapping):
                     log.trace(
                         f"definition {definition} is set to always_[apply|include]"
                     )
-                elif len(limiter) > 0 and definition not in limiter:
+                elif limiter and definition not in limiter:
                     log.trace(f"definition {definition} not in limiter, skipping")
                     continue
 
@@ -1,5 +1,6 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -199,7 +200,6 @@ class Definition(BaseModel):
 
         Args:
             working_dir (str): The working directory
-            invalidate_cache (int): Passing a random int here will ensure the LRU cache is bypassed
 
         Returns:
             Union[List[str], None]: The list of providers used by the definition or none
@@ -211,16 +211,36 @@ def cached_get_used_providers(working_dir: str) -> Union[List[str], None]:
     """
     Get the providers used by the definition
 
+    Preparing a definition needs the used providers several times, the definition
+    files are only walked and parsed the first time they are requested.
+
     Args:
         working_dir (str): The working directory
-        invalidate_cache (int): Passing a random int here will ensure the LRU cache is bypassed
 
     Returns:
         Union[List[str], None]: The list of providers used by the definition or none
     """
+    providers = _find_used_providers(working_dir)
+    if providers is None:
+        return None
+    return list(providers)
+
+
+@lru_cache(maxsize=None)
+def _find_used_providers(working_dir: str) -> Union[Tuple[str, ...], None]:
+    """
+    Find the providers required by the terraform files in a directory, the result
+    is cached by the directory.
+
+    Args:
+        working_dir (str): The directory containing the terraform files
+
+    Returns:
+        Union[Tuple[str, ...], None]: The names of the providers, or none
+    """
     from tfworker.util.terraform import find_required_providers
 
     try:
-        return list(find_required_providers(working_dir).keys())
+        return tuple(find_required_providers(working_dir).keys())
     except AttributeError:
         return None
@@ -77,22 +77,28 @@ class DefinitionPrepare:
             template_path=template_path, jinja_globals=self._get_template_vars(name)
         )
         for template_file in jinja_env.list_templates(filter_func=filter_templates):
-            write_template_file(jinja_env=jinja_env, template_path=template_path, template_file=template_file)
+            write_template_file(
+                jinja_env=jinja_env,
+                template_path=template_path,
+                template_file=template_file,
+            )
 
     def create_local_vars(self, name: str) -> None:
         """Create local vars from remote data sources"""
         definition = self._app_state.definitions[name]
         log.trace(f"creating local vars for definition {name}")
+        remote_vars = definition.get_remote_vars(
+            global_vars=self._app_state.loaded_config.global_vars.remote_vars
+        )
+        # render the whole file first, so it is written with a single call
+        content = "".join(
+            f"  {k} = data.terraform_remote_state.{v}\n" for k, v in remote_vars.items()
+        )
         with open(
             f"{definition.get_target_path(self._app_state.working_dir)}/{WORKER_LOCALS_FILENAME}",
             "w+",
         ) as tflocals:
-            tflocals.write("locals {\n")
-            for k, v in definition.get_remote_vars(
-                global_vars=self._app_state.loaded_config.global_vars.remote_vars
-            ).items():
-                tflocals.write(f"  {k} = data.terraform_remote_state.{v}\n")
-            tflocals.write("}\n\n")
+            tflocals.write(f"locals {{\n{content}}}\n\n")
 
     def create_worker_tf(self, name: str) -> None:
         """Create remote data sources, and required providers"""
@@ -105,14 +111,15 @@ class DefinitionPrepare:
         """Create the variable definitions"""
         definition = self._app_state.definitions[name]
         log.trace(f"creating terraform vars for definition {name}")
+        terraform_vars = definition.get_terraform_vars(
+            global_vars=self._app_state.loaded_config.global_vars.terraform_vars
+        )
+        content = "".join(f"{k} = {vars_typer(v)}\n" for k, v in terraform_vars.items())
         with open(
             f"{definition.get_target_path(self._app_state.working_dir)}/{WORKER_TFVARS_FILENAME}",
             "w+",
         ) as varfile:
-            for k, v in definition.get_terraform_vars(
-                global_vars=self._app_state.loaded_config.global_vars.terraform_vars
-            ).items():
-                varfile.write(f"{k} = {vars_typer(v)}\n")
+            varfile.write(content)
 
     def create_terraform_lockfile(self, name: str) -> None:
         """Create the terraform lockfile"""
@@ -190,23 +197,24 @@ class DefinitionPrepare:
         """Write the worker.tf file"""
         definition = self._app_state.definitions[name]
 
-        with open(
-            f"{definition.get_target_path(self._app_state.working_dir)}/{WORKER_TF_FILENAME}",
-            "w+",
-        ) as tffile:
-            # Write out the provider configurations for each provider
-            tffile.write(
-                f"{self._app_state.providers.provider_hcl(includes=definition.get_used_providers(self._app_state.working_dir))}\n\n"
-            )
-            tffile.write(
+        content = "".join(
+            (
+                # the provider configurations for each provider
+                f"{self._app_state.providers.provider_hcl(includes=definition.get_used_providers(self._app_state.working_dir))}\n\n",
                 TERRAFORM_TPL.format(
                     # the backend configuration
                     f"{self._app_state.backend.hcl(name)}",
                     # the required providers
                     provider_content,
-                )
+                ),
+                self._app_state.backend.data_hcl(remotes),
             )
-            tffile.write(self._app_state.backend.data_hcl(remotes))
+        )
+        with open(
+            f"{definition.get_target_path(self._app_state.working_dir)}/{WORKER_TF_FILENAME}",
+            "w+",
+        ) as tffile:
+            tffile.write(content)
 
     def _get_template_vars(self, name: str) -> Dict[str, str]:
         """
@@ -346,6 +354,7 @@ def vars_typer(v, inner=False):
     vars_typer is used to assemble variables as they are parsed from the yaml configuration
     into the required format to be used in terraform
     """
+    # booleans are singletons, the identity checks are the cheapest way to match them
     if v is True:
         return "true"
     elif v is False:
@@ -353,7 +362,7 @@ def vars_typer(v, inner=False):
     elif isinstance(v, list):
         rval = []
         for val in v:
-            result = Definition.vars_typer(val, inner=True)
+            result = vars_typer(val, inner=True)
             try:
                 rval.append(result.strip('"').strip("'"))
             except AttributeError:
@@ -365,7 +374,7 @@ def vars_typer(v, inner=False):
     elif isinstance(v, dict):
         rval = {}
         for k, val in v.items():
-            result = Definition.vars_typer(val, inner=True)
+            result = vars_typer(val, inner=True)
             try:
                 rval[k] = result.strip('"').strip("'")
             except AttributeError:
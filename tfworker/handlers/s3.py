@@ -61,6 +61,10 @@ class S3Handler(BaseHandler):
 
     @property
     def s3_client(self):
+        if self._s3_client is None:
+            # share the client of the S3 backend, it uses the same session and every
+            # new client loads and builds the service model again
+            self._s3_client = getattr(self.app_state.backend, "s3_client", None)
         if self._s3_client is None:
             self._s3_client = self.app_state.authenticators[
                 "aws"
@@ -1,4 +1,3 @@
-import copy
 import threading
 from collections.abc import Mapping
 from typing import TYPE_CHECKING, Dict, List
@@ -40,7 +39,9 @@ class ProvidersCollection(Mapping):
             provider_map = dict(
                 [(prov.tag, prov) for prov in ProvidersCollection.get_named_providers()]
             )
-            self._providers = copy.deepcopy(providers_odict) if providers_odict else {}
+            # a shallow copy is enough, the values are only read while each entry is
+            # replaced by its validated Provider
+            self._providers = dict(providers_odict) if providers_odict else {}
             for k, v in self._providers.items():
                 try:
                     config = ProviderConfig.model_validate(v)
@@ -1,5 +1,6 @@
 import typing as t
 from enum import Enum
+from functools import cache
 
 import click
 from pydantic import BaseModel, ValidationError
@@ -8,6 +9,19 @@ from pydantic.fields import PydanticUndefined
 import tfworker.util.log as log
 from tfworker.util.system import get_platform
 
+SUPPORTED_OPSYS = frozenset(["darwin", "linux"])
+SUPPORTED_MACHINE = frozenset(["amd64", "arm64"])
+
+# the details of each error reported by handle_config_error, the lines are joined
+# with a newline and indent so the first line is not prefixed
+_CONFIG_ERROR_DETAIL = (
+    "  Details:"
+    "\n      Error Type: {type}"
+    "\n      Error Loc: {loc}"
+    "\n      Error Msg: {msg}"
+    "\n      Input Value: {input}"
+)
+
 
 def handle_option_error(e: ValidationError) -> None:
     """Handle a Pydantic validation error.
@@ -31,9 +45,7 @@ def handle_option_error(e: ValidationError) -> None:
     except IndexError:
         error_message.append(str(e))
 
-    # use .format to work around python f-string limitation of not being able to use \n
-    # log.msg(f"{'\\n  '.join(error_message)}", log.LogLevel.ERROR)
-    log.error("{}".format("\n  ".join(error_message)))
+    log.error("\n  ".join(error_message))
     click.get_current_context().exit(1)
 
 
@@ -56,14 +68,9 @@ def handle_config_error(e: ValidationError) -> None:
             f"validation error while loading {e.ctx[0]} named {e.ctx[1]}"
         )
     for error in e.errors():
-        error_message.append("  Details:")
-        error_message.append(f"    Error Type: {error['type']}")
-        error_message.append(f"    Error Loc: {error['loc']}")
-        error_message.append(f"    Error Msg: {error['msg']}")
-        error_message.append(f"    Input Value: {error['input']}")
-
-    # use .format to work around python f-string limitation of not being able to use \n
-    log.error("{}".format("\n  ".join(error_message)))
+        error_message.append(_CONFIG_ERROR_DETAIL.format_map(error))
+
+    log.error("\n  ".join(error_message))
     click.get_current_context().exit(1)
 
 
@@ -150,23 +157,23 @@ def validate_deployment(ctx, deployment, name):
     return name
 
 
+@cache
 def validate_host() -> None:
     """Ensure that the script is being run on a supported platform.
 
+    The platform can not change during the lifetime of the process, so a
+    successful validation is cached.
+
     Raises:
         NotImplemented: If the script is being run on an unsupported platform.
     """
-
-    supported_opsys = ["darwin", "linux"]
-    supported_machine = ["amd64", "arm64"]
-
     opsys, machine = get_platform()
     message = []
 
-    if opsys not in supported_opsys:
+    if opsys not in SUPPORTED_OPSYS:
         message.append(f"running on {opsys} is not supported")
 
-    if machine not in supported_machine:
+    if machine not in SUPPORTED_MACHINE:
         message.append(f"running on {machine} is not supported")
 
     if message:
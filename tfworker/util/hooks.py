@@ -6,8 +6,11 @@ import base64
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple, Union
 
 import tfworker.util.log as log
 from tfworker.constants import (
@@ -22,6 +25,44 @@ from tfworker.util.system import pipe_exec
 if TYPE_CHECKING:
     from tfworker.backends.base import BaseBackend
 
+# the extensions which are probed directly before scanning the hook directory
+HOOK_SCRIPT_EXTENSIONS = ("", ".sh", ".py", ".bash")
+
+# characters removed or replaced in hook environment variable keys and values
+_KEY_TRANS = str.maketrans({" ": None, '"': None, "-": "_", ".": "_"})
+_VAL_TRANS = str.maketrans({" ": None, '"': None, "\n": None})
+
+# I'm sorry. :-)
+# this regex looks for variables in the form of:
+# <var_name, ITEM> = data.terraform_remote_state.<the name of a remote definition, STATE>.outputs.<the name of an output, STATE_ITEM>
+# it is applied to the whole locals file, so each match is anchored to the start of a line
+_REMOTE_VAR_RE = re.compile(
+    r"^[ \t]*(?P<item>\w+)[ \t]*\=.+data\.terraform_remote_state\.(?P<state>\w+)\.outputs\.(?P<state_item>\w+)",
+    re.MULTILINE,
+)
+
+# the maximum number of remote state items to resolve concurrently
+REMOTE_VARS_MAX_WORKERS = 16
+
+# remote vars are resolved concurrently, only one thread may build the state cache
+_state_cache_lock = threading.Lock()
+
+# parsed `terraform output -json` results keyed by (base_dir, state), this allows many
+# items from the same state to be resolved with a single terraform invocation, a failed
+# read is cached as the raised exception so the state is not read a second time
+_output_cache: Dict[Tuple[str, str], Union[Dict[str, Any], Exception]] = {}
+_output_cache_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_output_cache_lock = threading.Lock()
+
+# parsed state cache files keyed by path, holding the file mtime and an index of the
+# terraform_remote_state resources by name
+_state_cache_mem: Dict[str, Tuple[int, Dict[str, Dict[str, Any]]]] = {}
+_state_cache_mem_lock = threading.Lock()
+
+# the parsed worker generated files, keyed by path and parser, with the file mtime
+_worker_file_cache: Dict[Tuple[str, Callable], Tuple[int, List[Any]]] = {}
+_worker_file_cache_lock = threading.Lock()
+
 
 class TFHookVarType(Enum):
     """
@@ -36,6 +77,10 @@ class TFHookVarType(Enum):
         return self.value.upper()
 
 
+# the environment variable prefix for each hook variable type
+_HOOK_VAR_PREFIX = {var_type: f"{var_type}_" for var_type in TFHookVarType}
+
+
 def get_state_item(
     working_dir: str,
     env: Dict[str, str],
@@ -95,45 +140,122 @@ def _get_state_item_from_output(
         HookError: If there is an error reading the remote state item or if the output is empty or not in JSON format.
     """
     base_dir, _ = os.path.split(working_dir)
-    try:
-        (exit_code, stdout, stderr) = pipe_exec(
-            f"{terraform_bin} output -json -no-color {item}",
-            cwd=f"{base_dir}/{state}",
-            env=env,
-        )
-    except FileNotFoundError:
-        # the remote state is not setup, likely do to use of --limit
-        # this is acceptable, and is the responsibility of the hook
-        # to ensure it has all values needed for safe execution
-        raise
+    # a FileNotFoundError indicates the remote state is not setup, likely due to use
+    # of --limit; this is acceptable, and is the responsibility of the hook to ensure
+    # it has all values needed for safe execution
+    outputs = _load_state_outputs(base_dir, env, terraform_bin, state)
+
+    if item not in outputs:
+        raise HookError(f"Remote state item {state}.{item} not found in outputs")
+
+    return json.dumps(outputs[item]["value"], indent=None, separators=(",", ":"))
+
+
+def _load_state_outputs(
+    base_dir: str, env: Dict[str, str], terraform_bin: str, state: str
+) -> Dict[str, Any]:
+    """
+    Load all of the outputs for a state with a single `terraform output -json` call, the
+    parsed outputs, or the error raised reading them, are cached until
+    `clear_output_cache` is called.
+
+    Args:
+        base_dir (str): The directory containing all of the terraform definitions.
+        env (Dict[str, str]): The environment variables to pass to the terraform command.
+        terraform_bin (str): The path to the terraform binary.
+        state (str): The state name to get the outputs from.
+
+    Returns:
+        Dict[str, Any]: The outputs of the state, keyed by output name.
+
+    Raises:
+        HookError: If there is an error reading the outputs or if the output is empty or not in JSON format.
+    """
+    key = (base_dir, state)
+    with _output_cache_lock:
+        lock = _output_cache_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        if key not in _output_cache:
+            try:
+                _output_cache[key] = _read_state_outputs(
+                    base_dir, env, terraform_bin, state
+                )
+            except (FileNotFoundError, HookError) as e:
+                _output_cache[key] = e
+        outputs = _output_cache[key]
+
+    if isinstance(outputs, Exception):
+        raise outputs
+    return outputs
+
+
+def _read_state_outputs(
+    base_dir: str, env: Dict[str, str], terraform_bin: str, state: str
+) -> Dict[str, Any]:
+    """
+    Run `terraform output -json` for a state and parse the result.
+
+    Args:
+        base_dir (str): The directory containing all of the terraform definitions.
+        env (Dict[str, str]): The environment variables to pass to the terraform command.
+        terraform_bin (str): The path to the terraform binary.
+        state (str): The state name to get the outputs from.
+
+    Returns:
+        Dict[str, Any]: The outputs of the state, keyed by output name.
+
+    Raises:
+        HookError: If there is an error reading the outputs or if the output is empty or not in JSON format.
+    """
+    (exit_code, stdout, stderr) = pipe_exec(
+        (terraform_bin, "output", "-json", "-no-color"),
+        cwd=f"{base_dir}/{state}",
+        env=env,
+    )
 
     if exit_code != 0:
         raise HookError(
-            f"Error reading remote state item {state}.{item}, details: {stderr.decode()}"
+            f"Error reading remote state outputs for {state}, details: {stderr.decode()}"
         )
 
     if stdout is None:
         raise HookError(
-            f"Remote state item {state}.{item} is empty; This is completely"
+            f"Remote state outputs for {state} are empty; This is completely"
             " unexpected, failing..."
         )
 
     try:
-        json_output = json.loads(stdout)
+        return json.loads(stdout)
     except json.JSONDecodeError:
         raise HookError(
-            f"Error parsing remote state item {state}.{item}; output is not in JSON format"
+            f"Error parsing remote state outputs for {state}; output is not in JSON format"
         )
 
-    return json.dumps(json_output, indent=None, separators=(",", ":"))
 
+def clear_output_cache() -> None:
+    """
+    Clear the cached terraform outputs, outputs must be re-read once any definition
+    may have been changed.
 
+    The per state locks are kept, a thread which is loading outputs while the cache
+    is cleared still holds the lock any other thread loading the same state will use.
+    """
+    with _output_cache_lock:
+        _output_cache.clear()
+
+
+@lru_cache(maxsize=None)
 def check_hooks(
     phase: TerraformStage, working_dir: str, command: TerraformAction
 ) -> bool:
     """
     Check if a hook script exists for the given phase and command.
 
+    Hook directories are not modified after the definitions are prepared, so the
+    result is cached per (phase, working_dir, command); errors are not cached. If
+    hooks are ever written after the first check, call `check_hooks.cache_clear()`.
+
     Args:
         phase (TerraformStage): The phase of the terraform command.
         working_dir (str): The working directory of the terraform definition.
@@ -145,13 +267,12 @@ def check_hooks(
     hook_dir = f"{working_dir}/hooks"
     if not os.path.isdir(hook_dir):
         return False
-    for f in os.listdir(hook_dir):
-        if os.path.splitext(f)[0] == f"{phase}_{command}":
-            if os.access(f"{hook_dir}/{f}", os.X_OK):
-                return True
-            else:
-                raise HookError(f"{hook_dir}/{f} exists, but is not executable!")
-    return False
+    hook_file = _find_hook_file(hook_dir, phase, command)
+    if hook_file is None:
+        return False
+    if os.access(hook_file, os.X_OK):
+        return True
+    raise HookError(f"{hook_file} exists, but is not executable!")
 
 
 def hook_exec(
@@ -194,7 +315,16 @@ def hook_exec(
         local_env, working_dir, terraform_path, b64_encode
     )
     _populate_environment_with_extra_vars(local_env, extra_vars, b64_encode)
-    _execute_hook_script(hook_script, phase, command, working_dir, local_env, debug)
+    # when debugging, stream the output as the hook runs instead of buffering it
+    _execute_hook_script(
+        hook_script,
+        phase,
+        command,
+        working_dir,
+        local_env,
+        debug,
+        stream_output=debug,
+    )
 
 
 def _find_hook_script(working_dir: str, phase: str, command: str) -> str:
@@ -213,10 +343,39 @@ def _find_hook_script(working_dir: str, phase: str, command: str) -> str:
         HookError: If the hook script is missing.
     """
     hook_dir = os.path.join(working_dir, "hooks")
-    for f in os.listdir(hook_dir):
-        if os.path.splitext(f)[0] == f"{phase}_{command}":
-            return os.path.join(hook_dir, f)
-    raise HookError(f"Hook script missing from {hook_dir}")
+    hook_file = _find_hook_file(hook_dir, phase, command)
+    if hook_file is None:
+        raise HookError(f"Hook script missing from {hook_dir}")
+    return hook_file
+
+
+def _find_hook_file(hook_dir: str, phase: str, command: str) -> Union[str, None]:
+    """
+    Find the file for a hook in the hook directory. The common extensions are probed
+    directly, the directory is only scanned when none of them exist.
+
+    Args:
+        hook_dir (str): The directory containing the hook scripts.
+        phase (str): The phase of the hook.
+        command (str): The command to execute.
+
+    Returns:
+        Union[str, None]: The path to the hook file, or None if there is no hook file.
+    """
+    stem = f"{phase}_{command}"
+    for ext in HOOK_SCRIPT_EXTENSIONS:
+        hook_file = f"{hook_dir}/{stem}{ext}"
+        if os.path.isfile(hook_file):
+            return hook_file
+
+    try:
+        with os.scandir(hook_dir) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[0] == stem:
+                    return entry.path
+    except FileNotFoundError:
+        pass
+    return None
 
 
 def _prepare_environment(env: Dict[str, str], terraform_path: str) -> Dict[str, str]:
@@ -247,17 +406,30 @@ def _populate_environment_with_terraform_variables(
         terraform_path (str): The path to the Terraform binary.
         b64_encode (bool): If True, variables will be base64 encoded.
     """
-    if not os.path.isfile(os.path.join(working_dir, WORKER_TFVARS_FILENAME)):
-        return
+    tf_vars = _read_worker_file(
+        f"{working_dir}/{WORKER_TFVARS_FILENAME}", _parse_terraform_variables
+    )
+    for key, value in tf_vars:
+        _set_hook_env_var(local_env, TFHookVarType.VAR, key, value, b64_encode)
 
-    with open(os.path.join(working_dir, WORKER_TFVARS_FILENAME)) as f:
-        contents = f.read()
 
+def _parse_terraform_variables(contents: str) -> List[Tuple[str, str]]:
+    """
+    Parse the variables from the worker generated tfvars file.
+
+    Args:
+        contents (str): The contents of the tfvars file.
+
+    Returns:
+        List[Tuple[str, str]]: The variable names and values.
+    """
+    tf_vars = []
     for line in contents.splitlines():
-        tf_var = line.split("=")
-        _set_hook_env_var(
-            local_env, TFHookVarType.VAR, tf_var[0], tf_var[1], b64_encode
-        )
+        # only split on the first "=", values may contain them (e.g. base64)
+        key, sep, value = line.partition("=")
+        if sep:
+            tf_vars.append((key.strip(), value.strip()))
+    return tf_vars
 
 
 def _populate_environment_with_terraform_remote_vars(
@@ -272,31 +444,97 @@ def _populate_environment_with_terraform_remote_vars(
         terraform_path (str): The path to the Terraform binary.
         b64_encode (bool): If True, variables will be base64 encoded.
     """
-    if not os.path.isfile(os.path.join(working_dir, WORKER_LOCALS_FILENAME)):
+    tasks = _read_worker_file(
+        f"{working_dir}/{WORKER_LOCALS_FILENAME}", _parse_terraform_remote_vars
+    )
+    if not tasks:
         return
 
-    with open(os.path.join(working_dir, WORKER_LOCALS_FILENAME)) as f:
-        contents = f.read()
+    # each state is read with a single terraform call, read all of the states
+    # concurrently so the wall time is bound by the slowest state instead of the
+    # sum of them; the items are then resolved from the cached outputs
+    base_dir, _ = os.path.split(working_dir)
+    states = {state for _, state, _ in tasks}
+    with ThreadPoolExecutor(
+        max_workers=min(REMOTE_VARS_MAX_WORKERS, len(states))
+    ) as executor:
+        for state in states:
+            executor.submit(
+                _prefetch_state_outputs, base_dir, local_env, terraform_path, state
+            )
 
-    # I'm sorry. :-)
-    # this regex looks for variables in the form of:
-    # <var_name, ITEM> = data.terraform_remote_state.<the name of a remote definition, STATE>.outputs.<the name of an output, STATE_ITEM>
-    r = re.compile(
-        r"\s*(?P<item>\w+)\s*\=.+data\.terraform_remote_state\.(?P<state>\w+)\.outputs\.(?P<state_item>\w+)\s*"
-    )
+    for item, state, state_item in tasks:
+        _set_hook_env_var(
+            local_env,
+            TFHookVarType.REMOTE,
+            item,
+            get_state_item(working_dir, local_env, terraform_path, state, state_item),
+            b64_encode,
+        )
 
-    for line in contents.splitlines():
-        m = r.match(line)
-        if m:
-            item = m.group("item")
-            state = m.group("state")
-            state_item = m.group("state_item")
-            state_value = get_state_item(
-                working_dir, local_env, terraform_path, state, state_item
-            )
-            _set_hook_env_var(
-                local_env, TFHookVarType.REMOTE, item, state_value, b64_encode
-            )
+
+def _parse_terraform_remote_vars(contents: str) -> List[Tuple[str, str, str]]:
+    """
+    Parse the remote state references from the worker generated locals file.
+
+    Args:
+        contents (str): The contents of the locals file.
+
+    Returns:
+        List[Tuple[str, str, str]]: The variable names, states and state items.
+    """
+    return [
+        (m.group("item"), m.group("state"), m.group("state_item"))
+        for m in _REMOTE_VAR_RE.finditer(contents)
+    ]
+
+
+def _read_worker_file(path: str, parse: Callable[[str], List[Any]]) -> List[Any]:
+    """
+    Read and parse a worker generated file, the parsed contents are reused by
+    later hooks until the file changes.
+
+    Args:
+        path (str): The path to the file.
+        parse (Callable[[str], List[Any]]): The function to parse the file contents with.
+
+    Returns:
+        List[Any]: The parsed contents, or an empty list if the file does not exist.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return []
+
+    key = (path, parse)
+    with _worker_file_cache_lock:
+        cached = _worker_file_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(path) as f:
+            parsed = parse(f.read())
+        _worker_file_cache[key] = (mtime, parsed)
+        return parsed
+
+
+def _prefetch_state_outputs(
+    base_dir: str, env: Dict[str, str], terraform_bin: str, state: str
+) -> None:
+    """
+    Load the outputs for a state into the output cache, errors are cached with the
+    outputs and are raised when the state items are resolved.
+
+    Args:
+        base_dir (str): The directory containing all of the terraform definitions.
+        env (Dict[str, str]): The environment variables to pass to the terraform command.
+        terraform_bin (str): The path to the terraform binary.
+        state (str): The state name to get the outputs from.
+    """
+    try:
+        _load_state_outputs(base_dir, env, terraform_bin, state)
+    except (FileNotFoundError, HookError):
+        pass
 
 
 def _populate_environment_with_extra_vars(
@@ -331,24 +569,20 @@ def _set_hook_env_var(
         value (str): The value of the variable.
         b64_encode (bool, optional): If True, the value will be base64 encoded. Defaults to False.
     """
-    key_replace_items = {" ": "", '"': "", "-": "_", ".": "_"}
-    val_replace_items = {" ": "", '"': "", "\n": ""}
-
-    for k, v in key_replace_items.items():
-        key = key.replace(k, v)
+    key = key.translate(_KEY_TRANS)
 
-    for k, v in val_replace_items.items():
-        if isinstance(value, str):
-            value = value.replace(k, v)
-        if isinstance(value, bytes):
-            value = value.decode().replace(k, v)
-        if isinstance(value, bool):
-            value = str(value).upper()
+    if isinstance(value, bytes):
+        value = value.decode()
+    elif isinstance(value, bool):
+        value = str(value).upper()
+    if isinstance(value, str):
+        value = value.translate(_VAL_TRANS)
 
     if b64_encode:
-        value = base64.b64encode(value.encode())
+        # environment values must be strings, keep the encoded value as ascii text
+        value = base64.b64encode(value.encode()).decode("ascii")
 
-    local_env[f"{var_type}_{key.upper()}"] = value
+    local_env[_HOOK_VAR_PREFIX[var_type] + key.upper()] = value
 
 
 def _execute_hook_script(
@@ -370,6 +604,7 @@ def _execute_hook_script(
         working_dir (str): The working directory of the Terraform definition.
         local_env (Dict[str, str]): The environment variables.
         debug (bool): If True, debug information will be printed.
+        stream_output (bool, optional): If True, output is printed as the hook runs. Defaults to False.
 
     Raises:
         HookError: If the hook script execution fails.
@@ -417,10 +652,11 @@ def _get_state_item_from_remote(
         HookError: If the state item cannot be found or read.
     """
     cache_file = _get_state_cache_name(working_dir)
-    _make_state_cache(working_dir, env, terraform_bin)
+    with _state_cache_lock:
+        _make_state_cache(working_dir, env, terraform_bin)
 
-    state_cache = _read_state_cache(cache_file)
-    remote_state = _find_remote_state(state_cache, state)
+    state_index = _read_state_cache(cache_file)
+    remote_state = _find_remote_state(state_index, state)
 
     return _get_item_from_remote_state(remote_state, state, item)
 
@@ -457,31 +693,50 @@ def _make_state_cache(
     if not refresh and os.path.exists(state_cache):
         return
 
+    if refresh:
+        clear_output_cache()
+
     _run_terraform_refresh(terraform_bin, working_dir, env)
     state_json = _run_terraform_show(terraform_bin, working_dir, env)
     _write_state_cache(state_cache, state_json)
 
 
-def _read_state_cache(cache_file: str) -> Dict[str, Any]:
+def _read_state_cache(cache_file: str) -> Dict[str, Dict[str, Any]]:
     """
-    Read the state cache from a file.
+    Read the state cache from a file, the parsed file is reused until the file changes.
 
     Args:
         cache_file (str): The path to the state cache file.
 
     Returns:
-        Dict[str, Any]: The state cache JSON.
+        Dict[str, Dict[str, Any]]: The terraform_remote_state resources, keyed by name.
     """
-    with open(cache_file, "r") as f:
-        return json.load(f)
+    mtime = os.stat(cache_file).st_mtime_ns
+    with _state_cache_mem_lock:
+        cached = _state_cache_mem.get(cache_file)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(cache_file, "rb") as f:
+            state_cache = json.load(f)
 
+        index = {
+            resource["name"]: resource
+            for resource in state_cache["values"]["root_module"]["resources"]
+            if resource["type"] == "terraform_remote_state"
+        }
+        _state_cache_mem[cache_file] = (mtime, index)
+        return index
 
-def _find_remote_state(state_cache: Dict[str, Any], state: str) -> Dict[str, Any]:
+
+def _find_remote_state(
+    state_index: Dict[str, Dict[str, Any]], state: str
+) -> Dict[str, Any]:
     """
     Find the remote state in the state cache.
 
     Args:
-        state_cache (Dict[str, Any]): The state cache JSON.
+        state_index (Dict[str, Dict[str, Any]]): The remote state resources, keyed by name.
         state (str): The state name to find.
 
     Returns:
@@ -490,11 +745,10 @@ def _find_remote_state(state_cache: Dict[str, Any], state: str) -> Dict[str, Any
     Raises:
         HookError: If the remote state is not found in the state cache.
     """
-    resources = state_cache["values"]["root_module"]["resources"]
-    for resource in resources:
-        if resource["type"] == "terraform_remote_state" and resource["name"] == state:
-            return resource
-    raise HookError(f"Remote state item {state} not found")
+    try:
+        return state_index[state]
+    except KeyError:
+        raise HookError(f"Remote state item {state} not found")
 
 
 def _get_item_from_remote_state(
@@ -538,7 +792,7 @@ def _run_terraform_refresh(
         HookError: If there is an error refreshing the terraform state.
     """
     exit_code, _, stderr = pipe_exec(
-        f"{terraform_bin} apply -auto-approve -refresh-only",
+        (terraform_bin, "apply", "-auto-approve", "-refresh-only"),
         cwd=working_dir,
         env=env,
     )
@@ -548,7 +802,7 @@ def _run_terraform_refresh(
 
 def _run_terraform_show(
     terraform_bin: str, working_dir: str, env: Dict[str, str]
-) -> str:
+) -> bytes:
     """
     Run `terraform show -json` to get the state in JSON format.
 
@@ -558,13 +812,13 @@ def _run_terraform_show(
         env (Dict[str, str]): The environment variables to pass to the terraform command.
 
     Returns:
-        str: The state in JSON format.
+        bytes: The state in JSON format, as returned by terraform.
 
     Raises:
         HookError: If there is an error reading the terraform state.
     """
     exit_code, stdout, stderr = pipe_exec(
-        f"{terraform_bin} show -json",
+        (terraform_bin, "show", "-json"),
         cwd=working_dir,
         env=env,
     )
@@ -574,22 +828,22 @@ def _run_terraform_show(
         json.loads(stdout)
     except json.JSONDecodeError:
         raise HookError("Error parsing terraform state; output is not in JSON format")
-    return stdout.decode()
+    return stdout
 
 
-def _write_state_cache(state_cache: str, state_json: str) -> None:
+def _write_state_cache(state_cache: str, state_json: bytes) -> None:
     """
     Write the state JSON to the cache file.
 
     Args:
         state_cache (str): The path to the state cache file.
-        state_json (str): The state JSON to write.
+        state_json (bytes): The state JSON to write.
 
     Raises:
         HookError: If there is an error writing the state cache.
     """
     try:
-        with open(state_cache, "w") as f:
+        with open(state_cache, "wb") as f:
             f.write(state_json)
     except Exception as e:
         raise HookError(f"Error writing state cache to {state_cache}, details: {e}")
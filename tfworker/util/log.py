@@ -1,9 +1,9 @@
 import re
 from enum import Enum
-from functools import partial
-from typing import Any, Dict, List, Union
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Tuple, Union
 
-from click import secho
+from click import echo, style
 
 from tfworker.constants import REDACTED_ITEMS
 
@@ -18,6 +18,14 @@ class LogLevel(Enum):
 
 log_level = LogLevel.ERROR
 
+# colors for each log level, indexed by LogLevel.value
+_LEVEL_COLORS = ("cyan", "blue", "green", "yellow", "red")
+
+# the escape sequences for each level are built once rather than on every message,
+# output is identical to click.secho(msg, fg=color)
+_LEVEL_STYLES = tuple(style("", fg=color, reset=False) for color in _LEVEL_COLORS)
+_STYLE_RESET = style("", reset=True)
+
 
 def log(
     msg: Union[str | Dict[str, Any]], level: LogLevel = LogLevel.INFO, redact=False
@@ -30,21 +38,70 @@ def log(
     Args:
         msg ()
     """
-    global log_level
-    level_colors = {
-        log_level.TRACE: "cyan",
-        log_level.DEBUG: "blue",
-        log_level.INFO: "green",
-        log_level.WARN: "yellow",
-        log_level.ERROR: "red",
-    }
+    # skip suppressed messages before doing any redaction work
+    if level.value < log_level.value:
+        return
 
     if redact:
         msg = redact_items_token(msg)
 
-    if level.value >= log_level.value:
-        secho(msg, fg=level_colors[level])
-    return
+    echo(f"{_LEVEL_STYLES[level.value]}{msg}{_STYLE_RESET}")
+
+
+@lru_cache(maxsize=8)
+def _compile_redact_keys(redact: Tuple[str, ...], flags: int = 0) -> re.Pattern:
+    """
+    Compile an alternation matching any of the keys to redact
+
+    Alternatives are tried in the order given, so the first key in the
+    redact list wins when several keys match at the same position.
+
+    Args:
+        redact (Tuple[str, ...]): Keys to redact
+        flags (int): Flags to compile the pattern with
+
+    Returns:
+        re.Pattern: The compiled pattern
+    """
+    return re.compile("|".join(re.escape(key) for key in redact), flags)
+
+
+@lru_cache(maxsize=8)
+def _compile_redact_pattern(redact: Tuple[str, ...]) -> re.Pattern:
+    """
+    Compile the pattern used by redact_items_re to redact values of the keys
+
+    Args:
+        redact (Tuple[str, ...]): Keys to redact
+
+    Returns:
+        re.Pattern: The compiled pattern
+    """
+    # The regex pattern is designed to match and redact sensitive information from a string, preserving the original key, delimiter, and quote style.
+    #
+    # Pattern Components:
+    # r'(' + '|'.join(re.escape(key) for key in redact) + r')': This part dynamically constructs a regex group that matches any of the keys specified in the 'redact' list. 're.escape' ensures that any special characters in the keys are treated as literals.
+    #
+    # (\s*[:=]\s*|\s+): This group matches the delimiter that follows the key. It accounts for zero or more spaces (\s*) followed by either a colon (:) or an equals sign (=), again followed by zero or more spaces. Alternatively, it matches one or more spaces (\s+), allowing for different styles of key-value separation.
+    #
+    # (["\']?): This optional group matches either a single quote ('), a double quote ("), or no quote at all, capturing the opening quote style if present.
+    #
+    # (.*?): This non-greedy group matches the value associated with the key. The non-greedy qualifier (?) ensures that it stops matching at the first instance of the following group, which is the closing quote or the end of the value.
+    #
+    # (\3): This group is a backreference to the third group, matching the same quote style as the opening quote to ensure the closing quote is identical. If the opening quote was absent, this group matches nothing.
+    #
+    # (?=\s|$): This positive lookahead asserts that the character following the value (or closing quote if present) is either a whitespace character (\s) or the end of the string ($). This ensures that the match ends at the correct point without consuming any characters, allowing for subsequent matches to proceed correctly.
+    #
+    # The 'pattern.sub(r'\1\2\3REDACTED\5', items)' call replaces the matched value with 'REDACTED', preserving the key, delimiter, and quote style. The replacement string uses backreferences (\1, \2, \3, \5) to reconstruct the original text around 'REDACTED'.
+    return re.compile(
+        r"("
+        + "|".join(re.escape(key) for key in redact)
+        + r')(\s*[:=]\s*|\s+)(["\']?)(.*?)(\3)(?=\s|$)',
+        re.IGNORECASE,
+    )
+
+
+_DEFAULT_REDACT_PATTERN = _compile_redact_pattern(tuple(REDACTED_ITEMS))
 
 
 def redact_items_token(
@@ -73,44 +130,46 @@ def redact_items_token(
         a boolean. This function will attempt to redact the items in the string
         while preserving the structure of the string.
         """
+        if not redact:
+            return items
+        pattern = _compile_redact_keys(tuple(redact))
+        # most strings contain none of the keys, return them without copying
+        match = pattern.search(items)
+        if match is None:
+            return items
         result = []
         i = 0
-        while i < len(items):
-            # check if a key has been found
-            found = False
-            for key in redact:
-                # check if the key is in the items
-                if items[i : i + len(key)] == key:  # noqa: E203
-                    found = True
-                    result.append(key)
-                    i += len(key)
-                    # Include delimiters after the key (spaces, tabs, colons, equals signs)
-                    while i < len(items) and items[i] in " \t=:":
-                        result.append(items[i])
-                        i += 1
-                    # Check if the value is enclosed in quotes
-                    if i < len(items) and items[i] in "\"'":
-                        # handle quoted values
-                        quote = items[i]
-                        result.append(quote)
-                        i += 1
-                        # skip chars until the closing quote
-                        while i < len(items) and items[i] != quote:
-                            i += 1
-                        result.append("REDACTED")
-                        # include the closing quote if present
-                        if i < len(items) and items[i] == quote:
-                            result.append(quote)
-                            i += 1
-                    else:
-                        # handle unquoted values
-                        while i < len(items) and items[i] not in " \t,:;\n":
-                            i += 1
-                        result.append("REDACTED")
-            if not found:
-                # the token was not in the redact list
-                result.append(items[i])
+        n = len(items)
+        # the compiled alternation finds the next key at C speed, the value
+        # following the key is then consumed from the match position
+        while match is not None:
+            result.append(items[i : match.end()])  # noqa: E203
+            i = match.end()
+            # Include delimiters after the key (spaces, tabs, colons, equals signs)
+            start = i
+            while i < n and items[i] in " \t=:":
                 i += 1
+            result.append(items[start:i])
+            # Check if the value is enclosed in quotes
+            if i < n and items[i] in "\"'":
+                # handle quoted values, skipping chars until the closing quote
+                quote = items[i]
+                close = items.find(quote, i + 1)
+                result.append(quote)
+                result.append("REDACTED")
+                if close == -1:
+                    i = n
+                else:
+                    # include the closing quote
+                    result.append(quote)
+                    i = close + 1
+            else:
+                # handle unquoted values
+                while i < n and items[i] not in " \t,:;\n":
+                    i += 1
+                result.append("REDACTED")
+            match = pattern.search(items, i)
+        result.append(items[i:])
         return "".join(result)
 
     elif isinstance(items, dict):
@@ -120,7 +179,10 @@ def redact_items_token(
             elif k in redact:
                 items[k] = "REDACTED"
             elif isinstance(v, str):
-                items[k] = redact_items_token(v, redact)
+                # strings without a key are returned as is, skip the write
+                redacted = redact_items_token(v, redact)
+                if redacted is not v:
+                    items[k] = redacted
         return items
 
     else:
@@ -144,28 +206,14 @@ def redact_items_re(
         ValueError: If passed an item that is not a dictionary or string
     """
     if isinstance(items, str):
-        # The regex pattern is designed to match and redact sensitive information from a string, preserving the original key, delimiter, and quote style.
-        #
-        # Pattern Components:
-        # r'(' + '|'.join(re.escape(key) for key in redact) + r')': This part dynamically constructs a regex group that matches any of the keys specified in the 'redact' list. 're.escape' ensures that any special characters in the keys are treated as literals.
-        #
-        # (\s*[:=]\s*|\s+): This group matches the delimiter that follows the key. It accounts for zero or more spaces (\s*) followed by either a colon (:) or an equals sign (=), again followed by zero or more spaces. Alternatively, it matches one or more spaces (\s+), allowing for different styles of key-value separation.
-        #
-        # (["\']?): This optional group matches either a single quote ('), a double quote ("), or no quote at all, capturing the opening quote style if present.
-        #
-        # (.*?): This non-greedy group matches the value associated with the key. The non-greedy qualifier (?) ensures that it stops matching at the first instance of the following group, which is the closing quote or the end of the value.
-        #
-        # (\3): This group is a backreference to the third group, matching the same quote style as the opening quote to ensure the closing quote is identical. If the opening quote was absent, this group matches nothing.
-        #
-        # (?=\s|$): This positive lookahead asserts that the character following the value (or closing quote if present) is either a whitespace character (\s) or the end of the string ($). This ensures that the match ends at the correct point without consuming any characters, allowing for subsequent matches to proceed correctly.
-        #
-        # The 'pattern.sub(r'\1\2\3REDACTED\5', items)' call replaces the matched value with 'REDACTED', preserving the key, delimiter, and quote style. The replacement string uses backreferences (\1, \2, \3, \5) to reconstruct the original text around 'REDACTED'.
-        pattern = re.compile(
-            r"("
-            + "|".join(re.escape(key) for key in redact)
-            + r')(\s*[:=]\s*|\s+)(["\']?)(.*?)(\3)(?=\s|$)',
-            re.IGNORECASE,
-        )
+        # a plain search for the keys is much cheaper than the full pattern,
+        # and most strings contain none of them
+        if _compile_redact_keys(tuple(redact), re.IGNORECASE).search(items) is None:
+            return items
+        if redact is REDACTED_ITEMS:
+            pattern = _DEFAULT_REDACT_PATTERN
+        else:
+            pattern = _compile_redact_pattern(tuple(redact))
         return pattern.sub(r"\1\2\3REDACTED\5", items)
 
     elif isinstance(items, dict):
@@ -175,7 +223,10 @@ def redact_items_re(
             elif k in redact:
                 items[k] = "REDACTED"
             elif isinstance(v, str):
-                items[k] = redact_items_re(v, redact)
+                # strings without a key are returned as is, skip the write
+                redacted = redact_items_re(v, redact)
+                if redacted is not v:
+                    items[k] = redacted
         return items
 
     else:
@@ -1,9 +1,23 @@
 import os
 import platform
 import re
+import select
+import selectors
 import shlex
 import subprocess
-from typing import Dict, List, Tuple, Union
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+# the size of the blocks read from a streamed command's output
+STREAM_READ_SIZE = 65536
+
+# machine names which are reported differently by some platforms; some 64 bit arm
+# extensions will report aarch64, this is functionaly equivalent to arm64 which is
+# recognized and the pattern used by the TF community
+_MACHINE_MAP = {"x86_64": "amd64", "aarch64": "arm64"}
+
+# matches ANSI escape sequences, such as the colors in terraform output
+_ANSI_ESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
 
 
 def strip_ansi(line: str) -> str:
@@ -16,132 +30,241 @@ def strip_ansi(line: str) -> str:
     Returns:
         str: The string with ANSI escape sequences stripped.
     """
-    ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-    return ansi_escape.sub("", line)
+    return _ANSI_ESCAPE.sub("", line)
 
 
 def pipe_exec(
-    args: Union[str, List[str]],
+    args: Union[str, Sequence[str], List[Union[str, Sequence[str]]]],
     stdin: str = None,
     cwd: str = None,
     env: Dict[str, str] = None,
     stream_output: bool = False,
+    on_line: Callable[[bytes], None] = None,
 ) -> Tuple[int, Union[bytes, None], Union[bytes, None]]:
     """
     A function to take one or more commands and execute them in a pipeline, returning the output of the last command.
 
     Args:
-        args (str or list): A string or list of strings representing the command(s) to execute.
+        args (str, tuple or list): A command or a list of commands to execute as a pipeline. Each
+            command is either a string, which is split into arguments, or a tuple/list of arguments
+            that is used as is; a single command given as arguments must be a tuple.
         stdin (str, optional): A string to pass as stdin to the first command
         cwd (str, optional): The working directory to execute the command in.
         env (dict, optional): A dictionary of environment variables to set for the command.
         stream_output (bool, optional): A boolean indicating if the output should be streamed back to the caller.
+        on_line (callable, optional): Called with each raw line (without the newline) of streamed output,
+            by default each line is decoded and printed.
+
+    The pipes are always opened in binary mode with the default buffering. When streaming,
+    output is read from the pipe in large blocks and decoded one line at a time as it is
+    printed; line buffering the parent's side of the pipe would only add read syscalls, how
+    often output arrives is controlled by the child's own buffering.
 
     Returns:
         tuple: A tuple containing the return code, stdout, and stderr of the last command in the pipeline.
     """
     commands = []  # listed used to hold all the popen objects
-    # use the default environment if one is not specified
-    if env is None:
-        env = os.environ.copy()
+    # when env is None the commands inherit the current environment, there is no
+    # need to copy it
 
-    # if a single command was passed as a string, make it a list
+    # if a single command was passed as a string or tuple of arguments, make it a list
     if not isinstance(args, list):
         args = [args]
 
-    # setup various arguments for popen/popen.communicate, account for optional stdin
+    # split every command before starting any of them, so an invalid command can not
+    # leave part of the pipeline running
+    argvs = [_get_argv(cmd) for cmd in args]
+
+    # setup the arguments shared by every popen call, account for optional stdin
     popen_kwargs = {
         "stdout": subprocess.PIPE,
-        "stderr": subprocess.PIPE,
         "cwd": cwd,
         "env": env,
     }
-    popen_stdin_kwargs = {}
-    communicate_kwargs = {}
+    first_stdin = None
+    input = None
+    if stdin is not None:
+        first_stdin = subprocess.PIPE
+        input = stdin.encode()
 
-    if stream_output is True:
-        popen_kwargs["bufsize"] = 1
-        popen_kwargs["universal_newlines"] = True
+    last = len(argvs) - 1
+    for idx, argv in enumerate(argvs):
+        # every other process gets the stdout of the previous command as stdin
+        cmd_stdin = first_stdin if idx == 0 else commands[-1].stdout
+        # when streaming, stderr of the last command is combined with stdout
+        cmd_stderr = (
+            subprocess.STDOUT if idx == last and stream_output else subprocess.PIPE
+        )
 
-    if stdin is not None:
-        popen_stdin_kwargs["stdin"] = subprocess.PIPE
-        communicate_kwargs["input"] = stdin.encode()
-
-    if len(args) == 1 and stream_output is True:
-        popen_kwargs["stderr"] = subprocess.STDOUT
-
-    # handle the first command, requires distinct handling
-    i = args.pop(0)
-    commands.append(
-        subprocess.Popen(shlex.split(i), **popen_kwargs, **popen_stdin_kwargs)
-    )
-
-    # handle any additional commands
-    # every process now gets stdin as a pipe
-    for i, cmd_str in enumerate(args):
-        lastloop = True if len(args) - 1 == i else False
-        popen_kwargs["stdin"] = commands[-1].stdout
-
-        if lastloop and stream_output:
-            popen_kwargs["stderr"] = subprocess.STDOUT
-
-        commands.append(subprocess.Popen(shlex.split(cmd_str), **popen_kwargs))
-
-        # close stdout on the command before we just added to allow recieving SIGPIPE
-        commands[-2].stdout.close()
-
-    if stream_output is True:
-        # in order to stream the output, stderr and stdout streams must be combined to avoid
-        # any potential blocking, for this reason the execution methods are different
-        stdout = ""
-
-        # if there is more than one command we need to use communicate on the first to send
-        # in stdin and still allowing the pipeline to properly process
-        if len(commands) > 1:
-            # communicate in this instance needs a string type object, not bytes
-            communicate_kwargs["input"] = stdin
-            commands[0].communicate(**communicate_kwargs)
-
-        else:
-            # if it's just a single command we can not use communicate or we will not be able
-            # to stream the output, so write directly to stdin
-            if stdin is not None and len(commands) == 1:
-                commands[0].stdin.write(stdin + "\n")
-                commands[0].stdin.close()
-
-        # for a single command this will be the only command, for a pipeline reading from the
-        # last command will trigger all of the commands, communicating through their pipes
-        for line in iter(commands[-1].stdout.readline, ""):
-            print(line.rstrip())
-            stdout += line
-
-        # for streaming output stderr will be included with stdout, there's no way to make
-        # a distinction, so stderr will always be an empty bytes object
-        stderr = "".encode()
-        stdout = stdout.encode()
-        commands[-1].wait()
-        returncode = commands[-1].poll()
-
-    else:
-        # if stdin is not None:
-        if len(commands) > 1:
-            # in this case communicate_kwargs must only be passed to the first
-            # command in the pipe, and must NOT be passed to any other as the stdout/stdin
-            # is chained between the piped commands
-            commands[0].communicate(**communicate_kwargs)
-            stdout, stderr = commands[-1].communicate()
-            returncode = commands[-1].returncode
-        else:
-            stdout, stderr = commands[0].communicate(**communicate_kwargs)
-            returncode = commands[0].returncode
+        # on linux CPython starts children with vfork as long as no preexec_fn, user,
+        # group or session changes are requested; keep these arguments free of them
+        try:
+            commands.append(
+                subprocess.Popen(
+                    argv, stdin=cmd_stdin, stderr=cmd_stderr, **popen_kwargs
+                )
+            )
+        except OSError:
+            # do not leave the already started part of the pipeline running
+            for command in commands:
+                command.kill()
+                command.wait()
+            raise
+
+        if idx > 0:
+            # close stdout on the command before we just added to allow recieving SIGPIPE
+            commands[-2].stdout.close()
+
+    if stream_output is True and stdin is not None and len(commands) == 1:
+        # a single streamed command has always been sent its input as a line
+        input = f"{stdin}\n".encode()
+
+    # the input is written to the first command while the output of the last command is
+    # read, so neither side of the pipeline can block; for streaming output stderr is
+    # combined with stdout to avoid any potential blocking, so stderr is always empty
+    if stream_output is True and on_line is None:
+        on_line = _print_line
+    stdout, stderr = _communicate(commands, input, on_line if stream_output else None)
+    returncode = commands[-1].returncode
 
     return (returncode, stdout, stderr)
 
 
+def _get_argv(cmd: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Get the arguments to execute a command with, commands which are already split
+    into arguments are used as is.
+
+    Args:
+        cmd (str or sequence): The command string, or the arguments of the command.
+
+    Returns:
+        list: The arguments of the command.
+    """
+    if isinstance(cmd, str):
+        return list(_split_command(cmd))
+    return list(cmd)
+
+
+@lru_cache(maxsize=256)
+def _split_command(cmd: str) -> Tuple[str, ...]:
+    """
+    Split a command string into its arguments, the same commands are run many times
+    so the result is cached.
+
+    Args:
+        cmd (str): The command to split.
+
+    Returns:
+        tuple: The arguments of the command.
+    """
+    return tuple(shlex.split(cmd))
+
+
+def _communicate(
+    commands: List[subprocess.Popen],
+    input: Union[bytes, None],
+    on_line: Union[Callable[[bytes], None], None] = None,
+) -> Tuple[bytes, bytes]:
+    """
+    Write the input to the first command of a pipeline while reading the output of the
+    last command, multiplexing all of the pipes with a selector, then wait for every
+    command in the pipeline to exit.
+
+    Args:
+        commands (List[subprocess.Popen]): The commands in the pipeline.
+        input (bytes, optional): The input to write to the first command.
+        on_line (callable, optional): If set, called with each line of stdout as it is received.
+
+    Returns:
+        tuple: A tuple containing the stdout and stderr of the last command.
+    """
+    first, last = commands[0], commands[-1]
+    outputs = {}
+    # the stderr of the first command in a pipeline is drained so it can not block,
+    # but it is discarded; stderr is not a pipe when it is combined with stdout
+    for pipe in (last.stdout, last.stderr, first.stderr):
+        if pipe is not None:
+            outputs[pipe] = bytearray()
+    tail = b""
+
+    with selectors.DefaultSelector() as selector:
+        if first.stdin is not None:
+            if input:
+                selector.register(first.stdin, selectors.EVENT_WRITE)
+            else:
+                first.stdin.close()
+        for pipe in outputs:
+            selector.register(pipe, selectors.EVENT_READ)
+
+        offset = 0
+        while selector.get_map():
+            for key, _ in selector.select():
+                pipe = key.fileobj
+                if pipe is first.stdin:
+                    try:
+                        # a writable pipe accepts at least PIPE_BUF bytes without blocking
+                        offset += os.write(
+                            pipe.fileno(),
+                            input[offset : offset + select.PIPE_BUF],  # noqa: E203
+                        )
+                    except BrokenPipeError:
+                        offset = len(input)
+                    if offset >= len(input):
+                        selector.unregister(pipe)
+                        pipe.close()
+                else:
+                    data = os.read(pipe.fileno(), STREAM_READ_SIZE)
+                    if data:
+                        outputs[pipe] += data
+                        if on_line is not None and pipe is last.stdout:
+                            tail = _emit_lines(tail + data, on_line)
+                    else:
+                        selector.unregister(pipe)
+                        pipe.close()
+
+    if tail:
+        on_line(tail)
+
+    for command in commands:
+        command.wait()
+    return (bytes(outputs[last.stdout]), bytes(outputs.get(last.stderr, b"")))
+
+
+def _emit_lines(data: bytes, on_line: Callable[[bytes], None]) -> bytes:
+    """
+    Pass each complete line in the data to the line handler.
+
+    Args:
+        data (bytes): The data to split into lines.
+        on_line (callable): The handler called with each line.
+
+    Returns:
+        bytes: The trailing incomplete line, to be handled once the rest of it arrives.
+    """
+    lines = data.split(b"\n")
+    for line in lines[:-1]:
+        on_line(line)
+    return lines[-1]
+
+
+def _print_line(line: bytes) -> None:
+    """
+    Print a line of streamed output, this is the default line handler.
+
+    Args:
+        line (bytes): The line to print.
+    """
+    print(line.decode(errors="replace").rstrip())
+
+
+@lru_cache(maxsize=1)
 def get_platform() -> Tuple[str, str]:
     """
     Returns a formatted operating system / architecture tuple that is consistent with common distribution creation tools.
 
+    The platform can not change while running, so the result is cached.
+
     Returns:
         tuple: A tuple containing the operating system and architecture.
     """
@@ -151,12 +274,4 @@ def get_platform() -> Tuple[str, str]:
 
     # make sure machine uses consistent format
     machine = platform.machine()
-    if machine == "x86_64":
-        machine = "amd64"
-
-    # some 64 bit arm extensions will `report aarch64, this is functionaly
-    # equivalent to arm64 which is recognized and the pattern used by the TF
-    # community
-    if machine == "aarch64":
-        machine = "arm64"
-    return (opsys, machine)
+    return (opsys, _MACHINE_MAP.get(machine, machine))
@@ -1,9 +1,11 @@
 # This file contains functions primarily used by the "TerraformCommand" class
 # the goal of moving these functions here is to reduce the responsibility of
 # the TerraformCommand class, making it easier to test and maintain
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import click
 
@@ -17,43 +19,70 @@ from tfworker.exceptions import TFWorkerException
 from tfworker.providers import Provider, ProviderGID, ProvidersCollection
 from tfworker.util.system import pipe_exec
 
+# matches the version in the first line of `terraform version`, e.g. "Terraform v1.5.7"
+_TF_VERSION_RE = re.compile(r"\bv(\d+)\.(\d+)\.(\d+)")
+
+# terraform versions keyed by the device, inode, mtime and size of the binary, so every
+# path to the same binary shares an entry and a replaced binary is run again
+_terraform_version_cache: Dict[Tuple[int, int, int, int], Tuple[int, int]] = {}
+
 
-@lru_cache
 def get_terraform_version(terraform_bin: str, validation=False) -> tuple[int, int]:
     """
     Get the terraform version and return the major and minor version.
 
+    The version is cached for each terraform binary, identified by its file status
+    rather than its path.
+
     Args:
         terraform_bin (str): The path to the terraform binary.
         validation (bool, optional): A boolean indicating if the function should raise an error if the version cannot be determined. Defaults to False.
     """
-
-    # @TODO: instead of exiting, raise an error to handle it in the caller
-    def click_exit():
-        log.error(f"unable to get terraform version from {terraform_bin} version")
-        click.get_current_context().exit(1)
-
-    def validation_exit():
-        raise ValueError(
-            f"unable to get terraform version from {terraform_bin} version"
-        )
+    try:
+        st = os.stat(terraform_bin)
+        fingerprint = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        fingerprint = None
+    if fingerprint in _terraform_version_cache:
+        return _terraform_version_cache[fingerprint]
 
     (return_code, stdout, stderr) = pipe_exec(f"{terraform_bin} version")
     if return_code != 0:
-        if validation:
-            validation_exit()
-        click_exit()
-    version = stdout.decode("UTF-8").split("\n")[0]
-    version_search = re.search(r".*\s+v(\d+)\.(\d+)\.(\d+)", version)
+        _terraform_version_exit(terraform_bin, validation)
+    # only the first line holds the version, decode just that line
+    version = stdout.split(b"\n", 1)[0].decode("ascii", "replace")
+    version_search = _TF_VERSION_RE.search(version)
     if version_search:
         log.debug(
             f"Terraform Version Result: {version}, using major:{version_search.group(1)}, minor:{version_search.group(2)}",
         )
-        return (int(version_search.group(1)), int(version_search.group(2)))
+        result = (int(version_search.group(1)), int(version_search.group(2)))
+        if fingerprint is not None:
+            _terraform_version_cache[fingerprint] = result
+        return result
     else:
-        if validation:
-            validation_exit()
-        click_exit()
+        _terraform_version_exit(terraform_bin, validation)
+
+
+# @TODO: instead of exiting, raise an error to handle it in the caller
+def _terraform_version_exit(terraform_bin: str, validation: bool) -> None:
+    """
+    Handle a terraform version which can not be determined, by raising an error
+    during validation or exiting otherwise.
+
+    Args:
+        terraform_bin (str): The path to the terraform binary.
+        validation (bool): A boolean indicating if an error should be raised.
+
+    Raises:
+        ValueError: If validation is True.
+    """
+    if validation:
+        raise ValueError(
+            f"unable to get terraform version from {terraform_bin} version"
+        )
+    log.error(f"unable to get terraform version from {terraform_bin} version")
+    click.get_current_context().exit(1)
 
 
 def mirror_providers(
@@ -69,19 +98,60 @@ def mirror_providers(
         cache_dir (str): The cache directory.
     """
     log.debug(f"Mirroring providers to {cache_dir}")
+    # check the cache first, there is no need to run terraform when nothing is missing
+    includes = tfhelpers._providers_to_mirror(providers, cache_dir)
+    if not includes:
+        log.debug("All providers in cache")
+        return
+
     try:
-        with tfhelpers._write_mirror_configuration(
-            providers, working_dir, cache_dir
-        ) as temp_dir:
-            (return_code, _, stderr) = pipe_exec(
-                f"{terraform_bin} providers mirror {cache_dir}",
-                cwd=temp_dir,
-                stream_output=True,
+        # each provider is downloaded into its own directory of the cache, so the
+        # providers are mirrored by separate terraform processes in parallel
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            list(
+                ex.map(
+                    lambda name: _mirror_provider_set(
+                        providers, terraform_bin, working_dir, cache_dir, [name]
+                    ),
+                    includes,
+                )
             )
-            if return_code != 0:
-                raise TFWorkerException(f"Unable to mirror providers: {stderr}")
-    except IndexError:
-        log.debug("All providers in cache")
+    finally:
+        # the mirror changes the contents of the provider cache directories
+        tfhelpers._list_provider_dir.cache_clear()
+        tfhelpers._load_version_file.cache_clear()
+
+
+def _mirror_provider_set(
+    providers: ProvidersCollection,
+    terraform_bin: str,
+    working_dir: str,
+    cache_dir: str,
+    includes: List[str],
+) -> None:
+    """
+    Mirror a set of providers in the cache directory with a single terraform process.
+
+    Args:
+        providers (ProvidersCollection): The providers.
+        terraform_bin (str): The path to the terraform binary.
+        working_dir (str): The working directory.
+        cache_dir (str): The cache directory.
+        includes (List[str]): The names of the providers to mirror.
+
+    Raises:
+        TFWorkerException: If the providers can not be mirrored.
+    """
+    with tfhelpers._write_mirror_configuration(
+        providers, working_dir, cache_dir, includes=includes
+    ) as temp_dir:
+        (return_code, _, stderr) = pipe_exec(
+            f"{terraform_bin} providers mirror {cache_dir}",
+            cwd=temp_dir,
+            stream_output=True,
+        )
+        if return_code != 0:
+            raise TFWorkerException(f"Unable to mirror providers: {stderr}")
 
 
 def generate_terraform_lockfile(
@@ -102,14 +172,21 @@ def generate_terraform_lockfile(
     Returns:
         Union[None, str]: The content of the .terraform.lock.hcl file or None if any required providers are not in the cache
     """
-    lockfile = []
+    locked = []
     provider: Provider
 
     log.trace(
         f"generating lockfile for providers: {included_providers or [x.name for x in providers.values()]}"
     )
+    included = None if included_providers is None else frozenset(included_providers)
     for provider in providers.values():
         log.trace(f"checking provider {provider} / {provider.gid}")
+        # providers which are not included do not need to be in the cache
+        if included is not None and provider.name not in included:
+            log.trace(
+                f"Provider {provider.gid} not in included_providers, not adding to lockfile"
+            )
+            continue
         if tfhelpers._not_in_cache(
             provider.gid, provider.config.requirements.version, cache_dir
         ):
@@ -117,24 +194,33 @@ def generate_terraform_lockfile(
                 f"Provider {provider.gid} not in cache, skipping lockfile generation"
             )
             return None
-        if included_providers is not None and provider.name not in included_providers:
-            log.trace(
-                f"Provider {provider.gid} not in included_providers, not adding to lockfile"
-            )
-            continue
         log.trace(f"Provider {provider.gid} is in cache, adding to lockfile")
-        lockfile.append(f'provider "{str(provider.gid)}" {{')
-        lockfile.append(f'  version     = "{provider.config.requirements.version}"')
-        lockfile.append(f'  constraints = "{provider.config.requirements.version}"')
-        lockfile.append("  hashes = [")
-        for hash in tfhelpers._get_cached_hash(
-            provider.gid, provider.config.requirements.version, cache_dir
-        ):
-            lockfile.append(f'    "{hash}",')
-        lockfile.append("  ]")
-        lockfile.append("}")
-        lockfile.append("")
-    return "\n".join(lockfile)
+        locked.append(provider)
+
+    # read the cached version files concurrently, the reads are independent
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        all_hashes = list(
+            ex.map(
+                lambda p: tfhelpers._get_cached_hash(
+                    p.gid, p.config.requirements.version, cache_dir
+                ),
+                locked,
+            )
+        )
+
+    blocks = []
+    for provider, hashes in zip(locked, all_hashes):
+        version = provider.config.requirements.version
+        # providers are separated by a blank line
+        blocks.append(
+            f'provider "{provider.gid}" {{\n'
+            f'  version     = "{version}"\n'
+            f'  constraints = "{version}"\n'
+            "  hashes = [\n"
+            + "".join(f'    "{hash}",\n' for hash in hashes)
+            + "  ]\n}\n"
+        )
+    return "\n".join(blocks)
 
 
 @lru_cache
@@ -158,17 +244,25 @@ def get_provider_gid_from_source(source: str) -> ProviderGID:
         raise ValueError(
             f"Invalid source string, must contain between 1 and 3 parts: {source}"
         )
-    parts = source.split("/")
-    if len(parts) > 3 or len(parts) < 1:
+
+    # take the parts from the end, with defaults for hostname and namespace
+    rest, sep, ptype = source.rpartition("/")
+    if not sep:
+        return ProviderGID(
+            hostname=TF_PROVIDER_DEFAULT_HOSTNAME,
+            namespace=TF_PROVIDER_DEFAULT_NAMESPACE,
+            type=ptype,
+        )
+    hostname, sep, namespace = rest.rpartition("/")
+    if not sep:
+        return ProviderGID(
+            hostname=TF_PROVIDER_DEFAULT_HOSTNAME, namespace=namespace, type=ptype
+        )
+    if "/" in hostname:
         raise ValueError(
             f"Invalid source string, must contain between 1 and 3 parts: {source}"
         )
 
-    # Assign parts with defaults for hostname and namespace
-    ptype = parts[-1]
-    namespace = parts[-2] if len(parts) > 1 else TF_PROVIDER_DEFAULT_NAMESPACE
-    hostname = parts[-3] if len(parts) > 2 else TF_PROVIDER_DEFAULT_HOSTNAME
-
     return ProviderGID(hostname=hostname, namespace=namespace, type=ptype)
 
 
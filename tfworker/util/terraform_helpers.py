@@ -1,17 +1,21 @@
 import json
 import os
-import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from tempfile import TemporaryDirectory
-from typing import TYPE_CHECKING, Dict, List
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
 
-import hcl2
-from lark.exceptions import UnexpectedToken
 from packaging.specifiers import InvalidSpecifier, SpecifierSet
 
 import tfworker.util.log as log
 from tfworker.exceptions import TFWorkerException
 from tfworker.util.system import get_platform
 
+# the parsed terraform files, keyed by path, with the file mtime and size
+_tf_parse_cache: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+_tf_parse_cache_lock = threading.Lock()
+
 if TYPE_CHECKING:
     from tfworker.providers.collection import (  # pragma: no cover  # noqa: F401
         ProvidersCollection,
@@ -33,22 +37,40 @@ def _not_in_cache(gid: "ProviderGID", version: str, cache_dir: str) -> bool:
     Returns:
         bool: True if the provider is not in the cache directory.
     """
-    provider_dir = pathlib.Path(cache_dir) / gid.hostname / gid.namespace / gid.type
+    provider_dir = _get_provider_cache_dir(gid, cache_dir)
     platform = get_platform()
-    if not provider_dir.exists():
-        return True
+    names = _list_provider_dir(provider_dir)
 
     # look for version.json and terraform-provider-_version_platform.zip in the provider directory
-    version_file = provider_dir / f"{version}.json"
+    version_file = f"{version}.json"
     provider_file = (
-        provider_dir
-        / f"terraform-provider-{gid.type}_{version}_{platform[0]}_{platform[1]}.zip"
+        f"terraform-provider-{gid.type}_{version}_{platform[0]}_{platform[1]}.zip"
     )
-    if not version_file.exists() or not provider_file.exists():
+    if version_file not in names or provider_file not in names:
         return True
     return False
 
 
+@lru_cache
+def _list_provider_dir(provider_dir: str) -> frozenset:
+    """
+    List the files in a provider cache directory, the listing is cached so every
+    provider sharing the directory is checked with a single scan; the cache must
+    be cleared when providers are mirrored.
+
+    Args:
+        provider_dir (str): The provider cache directory.
+
+    Returns:
+        frozenset: The names of the files in the directory, empty if it does not exist.
+    """
+    try:
+        with os.scandir(provider_dir) as it:
+            return frozenset(e.name for e in it)
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+
 def _get_cached_hash(gid: "ProviderGID", version: str, cache_dir: str) -> str:
     """
     Get the hash of the cached provider.
@@ -64,17 +86,53 @@ def _get_cached_hash(gid: "ProviderGID", version: str, cache_dir: str) -> str:
         ValueError: If the provider hash can not be determined but the file is present
     """
     provider_dir = _get_provider_cache_dir(gid, cache_dir)
-    version_file = provider_dir / f"{version}.json"
-    with open(version_file, "r") as f:
-        hash_data = json.load(f)
+    version_file = os.path.join(provider_dir, f"{version}.json")
+    hash_data = _load_version_file(version_file)
 
     platform = get_platform()
 
     return hash_data["archives"][f"{platform[0]}_{platform[1]}"]["hashes"]
 
 
+@lru_cache(maxsize=256)
+def _load_version_file(version_file: str) -> dict:
+    """
+    Load a provider version file from the cache, the file is read once for every
+    lockfile generated from it; the cache must be cleared when providers are mirrored.
+
+    Args:
+        version_file (str): The path to the version file.
+
+    Returns:
+        dict: The parsed version file, callers must not modify it.
+    """
+    with open(version_file, "rb") as f:
+        return json.loads(f.read())
+
+
+def _providers_to_mirror(providers: "ProvidersCollection", cache_dir: str) -> List[str]:
+    """
+    Get the names of the providers which are not in the cache directory.
+
+    Args:
+        providers (ProvidersCollection): The providers to check.
+        cache_dir (str): The cache directory.
+
+    Returns:
+        List[str]: The names of the providers to mirror.
+    """
+    return [
+        x.name
+        for x in providers.values()
+        if _not_in_cache(x.gid, x.config.requirements.version, cache_dir)
+    ]
+
+
 def _write_mirror_configuration(
-    providers: "ProvidersCollection", working_dir: str, cache_dir: str
+    providers: "ProvidersCollection",
+    working_dir: str,
+    cache_dir: str,
+    includes: Union[None, List[str]] = None,
 ) -> TemporaryDirectory:
     """
     Write the mirror configuration to a temporary directory in the working directory.
@@ -82,6 +140,9 @@ def _write_mirror_configuration(
     Args:
         providers (ProvidersCollection): The providers to mirror.
         working_dir (str): The working directory.
+        cache_dir (str): The cache directory.
+        includes (List[str], optional): The names of the providers to mirror, by default
+            the providers which are not in the cache directory.
 
     Returns:
         TemporaryDirectory: A temporary directory containing the mirror configuration.
@@ -89,11 +150,8 @@ def _write_mirror_configuration(
     Raises:
         IndexError: If there are no providers to mirror.
     """
-    includes = [
-        x.name
-        for x in providers.values()
-        if _not_in_cache(x.gid, x.config.requirements.version, cache_dir)
-    ]
+    if includes is None:
+        includes = _providers_to_mirror(providers, cache_dir)
 
     if len(includes) == 0:
         raise IndexError("No providers to mirror")
@@ -103,9 +161,13 @@ def _write_mirror_configuration(
         providers=providers, includes=includes
     )
     temp_dir = TemporaryDirectory(dir=working_dir)
-    mirror_file = pathlib.Path(temp_dir.name) / "terraform.tf"
-    with open(mirror_file, "w") as f:
-        f.write(mirror_configuration)
+    mirror_file = os.path.join(temp_dir.name, "terraform.tf")
+    # a single unbuffered write, the configuration is small
+    fd = os.open(mirror_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, mirror_configuration.encode("utf-8"))
+    finally:
+        os.close(fd)
     return temp_dir
 
 
@@ -116,11 +178,7 @@ def _create_mirror_configuration(
     Generate a terraform configuration file with all of the providers
     to mirror.
     """
-    tf_string = []
-    tf_string.append("terraform {")
-    tf_string.append(providers.required_hcl(includes=includes))
-    tf_string.append("}")
-    return "\n".join(tf_string)
+    return f"terraform {{\n{providers.required_hcl(includes=includes)}\n}}"
 
 
 def _get_provider_cache_dir(gid: "ProviderGID", cache_dir: str) -> str:
@@ -134,7 +192,7 @@ def _get_provider_cache_dir(gid: "ProviderGID", cache_dir: str) -> str:
     Returns:
         str: The cache directory for the provider.
     """
-    return pathlib.Path(cache_dir) / gid.hostname / gid.namespace / gid.type
+    return os.path.join(cache_dir, gid.hostname, gid.namespace, gid.type)
 
 
 def _find_required_providers(
@@ -149,28 +207,118 @@ def _find_required_providers(
     Returns:
         Dict[str, Dict[str, ProviderRequirements]]: A dictionary of required providers.
     """
+    paths = _find_tf_files(search_dir)
+
+    # reading and parsing the files is independent, spread it over a thread pool;
+    # the results are merged in order so conflicts are reported consistently
     providers = {}
-    for root, _, files in os.walk(search_dir, followlinks=True):
-        for file in files:
-            if file.endswith(".tf"):
-                with open(f"{root}/{file}", "r") as f:
-                    try:
-                        content = hcl2.load(f)
-                    except UnexpectedToken as e:
-                        log.info(
-                            f"not processing {root}/{file} for required providers; see debug output for HCL parsing errors"
-                        )
-                        log.debug(f"HCL processing errors in {root}/{file}: {e}")
-                        continue
-                    _update_parsed_providers(
-                        providers, _parse_required_providers(content)
-                    )
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as ex:
+        for parsed in ex.map(_find_file_required_providers, paths):
+            if parsed:
+                _update_parsed_providers(providers, parsed)
+    # the versions are collected as strings, parse each distinct one only once
+    for provider in providers.values():
+        provider["version"] = _combine_specifiers(provider["version"])
     log.trace(
         f"Found required providers: {[x for x in providers.keys()]} in {search_dir}"
     )
     return providers
 
 
+def _find_tf_files(search_dir: str) -> List[str]:
+    """
+    Find all of the terraform files in the search directory, following symlinks.
+
+    Args:
+        search_dir (str): The directory to search.
+
+    Returns:
+        List[str]: The paths of the terraform files.
+    """
+    # walk the tree with scandir directly, the entries cache the file type so no
+    # additional stat calls or per directory lists are needed; like os.walk,
+    # directories which can not be read are skipped
+    paths = []
+    stack = [search_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".tf"):
+                        paths.append(entry.path)
+        except OSError:
+            continue
+    return paths
+
+
+def _find_file_required_providers(
+    path: str,
+) -> Union[None, Dict[str, "ProviderRequirements"]]:
+    """
+    Find the required providers specified in a single terraform file.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        Dict[str, ProviderRequirements]: The required providers, or None if the file
+            does not declare any or can not be parsed.
+    """
+    with open(path, "rb") as f:
+        blob = f.read()
+        st = os.fstat(f.fileno())
+    # most files do not declare providers, skip parsing them entirely
+    if b"required_providers" not in blob:
+        return None
+    # the parser is only imported once there is something to parse, see _parse_tf
+    from lark.exceptions import UnexpectedToken
+
+    try:
+        content = _parse_tf(path, st, blob)
+    except UnexpectedToken as e:
+        log.info(
+            f"not processing {path} for required providers; see debug output for HCL parsing errors"
+        )
+        log.debug(f"HCL processing errors in {path}: {e}")
+        return None
+    return _parse_required_providers(content)
+
+
+def _parse_tf(path: str, stat: os.stat_result, blob: bytes) -> dict:
+    """
+    Parse the HCL content of a terraform file, the parsed content is cached by the
+    path, and reused while the modification time and size of the file are unchanged.
+
+    Args:
+        path (str): The path of the file.
+        stat (os.stat_result): The status of the file when it was read.
+        blob (bytes): The content of the file.
+
+    Returns:
+        dict: The parsed content, callers must not modify it.
+
+    Raises:
+        UnexpectedToken: If the content is not valid HCL.
+    """
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _tf_parse_cache_lock:
+        cached = _tf_parse_cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # importing the parser builds its grammar, which is slow, so it is only imported
+    # when a file is actually parsed
+    import hcl2
+
+    # the lock is not held while parsing, files are parsed concurrently
+    content = hcl2.loads(blob.decode("utf-8"))
+    with _tf_parse_cache_lock:
+        _tf_parse_cache[path] = (version, content)
+    return content
+
+
 def _parse_required_providers(content: dict) -> Dict[str, "ProviderRequirements"]:
     """
     Parse the required providers from the content.
@@ -197,7 +345,8 @@ def _parse_required_providers(content: dict) -> Dict[str, "ProviderRequirements"
 
 def _update_parsed_providers(providers: dict, parsed_providers: dict):
     """
-    Update the providers with the parsed providers.
+    Update the providers with the parsed providers, the versions of each provider
+    are collected as strings to be combined once every file is parsed.
 
     Args:
         providers (dict): The providers to update.
@@ -210,7 +359,7 @@ def _update_parsed_providers(providers: dict, parsed_providers: dict):
         if k not in providers:
             new_provider = {
                 "source": v.get("source", ""),
-                "version": _get_specifier_set(v.get("version", "")),
+                "version": {v.get("version", ""): None},
             }
             providers[k] = new_provider
             continue
@@ -220,15 +369,31 @@ def _update_parsed_providers(providers: dict, parsed_providers: dict):
                     f"provider {k} has conflicting sources: {v['source']} and {providers[k]['source']}"
                 )
         if v.get("version") is not None:
-            providers[k]["version"] = providers[k]["version"] & _get_specifier_set(
-                v["version"]
-            )
+            providers[k]["version"][v["version"]] = None
     return providers
 
 
+def _combine_specifiers(versions: Dict[str, None]) -> SpecifierSet:
+    """
+    Combine the version constraints of a provider into a single SpecifierSet.
+
+    Args:
+        versions (Dict[str, None]): The distinct version constraints, in the order found.
+
+    Returns:
+        SpecifierSet: The SpecifierSet satisfying all of the version constraints.
+    """
+    specifier_set = SpecifierSet()
+    for version in versions:
+        specifier_set &= _get_specifier_set(version)
+    return specifier_set
+
+
+@lru_cache(maxsize=512)
 def _get_specifier_set(version: str) -> SpecifierSet:
     """
-    Get the SpecifierSet for the version.
+    Get the SpecifierSet for the version, the same constraints are repeated across
+    modules so the result is cached; callers must not modify it.
 
     Args:
         version (str): The version to get the SpecifierSet for.